@@ -1,7 +1,102 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from vector import Vector2
 
 
 class AABB:
     def __init__(self, minX, minY, maxX, maxY):
         self.min = Vector2(minX, minY)
-        self.max = Vector2(maxX, maxY)
\ No newline at end of file
+        self.max = Vector2(maxX, maxY)
+
+    def perimeter(self):
+        return 2.0 * ((self.max.x - self.min.x) + (self.max.y - self.min.y))
+
+    def union(self, other: 'AABB') -> 'AABB':
+        return AABB(min(self.min.x, other.min.x), min(self.min.y, other.min.y),
+                    max(self.max.x, other.max.x), max(self.max.y, other.max.y))
+
+    def expanded(self, margin: float) -> 'AABB':
+        return AABB(self.min.x - margin, self.min.y - margin, self.max.x + margin, self.max.y + margin)
+
+    def contains(self, other: 'AABB') -> bool:
+        return (self.min.x <= other.min.x and self.min.y <= other.min.y and
+                other.max.x <= self.max.x and other.max.y <= self.max.y)
+
+    def contains_point(self, x, y) -> bool:
+        return self.min.x <= x <= self.max.x and self.min.y <= y <= self.max.y
+
+    def overlaps(self, other: 'AABB') -> bool:
+        return not (self.max.x < other.min.x or other.max.x < self.min.x or
+                    self.max.y < other.min.y or other.max.y < self.min.y)
+
+
+class AABBArray:
+    # Bounds of a list of bodies as four flat columns, one row per body, so overlap tests read plain floats.
+    BLOCK_ROWS = 256
+
+    def __init__(self, count: int = 0):
+        self.min_x = [0.0] * count
+        self.min_y = [0.0] * count
+        self.max_x = [0.0] * count
+        self.max_y = [0.0] * count
+
+    def __len__(self):
+        return len(self.min_x)
+
+    def resize(self, count: int):
+        for column in (self.min_x, self.min_y, self.max_x, self.max_y):
+            del column[count:]
+            column.extend([0.0] * (count - len(column)))
+
+    def set(self, index: int, aabb: AABB):
+        self.min_x[index] = aabb.min.x
+        self.min_y[index] = aabb.min.y
+        self.max_x[index] = aabb.max.x
+        self.max_y[index] = aabb.max.y
+
+    def get(self, index: int) -> AABB:
+        return AABB(self.min_x[index], self.min_y[index], self.max_x[index], self.max_y[index])
+
+    def select(self, indices) -> 'AABBArray':
+        bounds = AABBArray()
+        bounds.min_x = [self.min_x[i] for i in indices]
+        bounds.min_y = [self.min_y[i] for i in indices]
+        bounds.max_x = [self.max_x[i] for i in indices]
+        bounds.max_y = [self.max_y[i] for i in indices]
+        return bounds
+
+    def overlaps(self, i: int, j: int) -> bool:
+        # Same strict test as Collisions.intersect_aabbs, so touching boxes do not overlap.
+        return not (self.max_x[i] <= self.min_x[j] or self.max_x[j] <= self.min_x[i] or
+                    self.max_y[i] <= self.min_y[j] or self.max_y[j] <= self.min_y[i])
+
+    def overlapping_pairs(self, active):
+        # Every overlapping (i, j) with i < j and at least one active row, in (i, j) order.
+        count = len(self)
+        if np is not None:
+            min_x = np.array(self.min_x)
+            min_y = np.array(self.min_y)
+            max_x = np.array(self.max_x)
+            max_y = np.array(self.max_y)
+            is_active = np.array(active, dtype=np.bool_)
+
+            # Rows are tested against every column a block at a time, which bounds the size of the overlap matrix.
+            pairs = []
+            for start in range(0, count, self.BLOCK_ROWS):
+                rows = slice(start, start + self.BLOCK_ROWS)
+                overlap = ((max_x[rows, None] > min_x) & (max_x > min_x[rows, None]) &
+                           (max_y[rows, None] > min_y) & (max_y > min_y[rows, None]))
+                overlap &= is_active[rows, None] | is_active
+                first, second = np.nonzero(np.triu(overlap, start + 1))
+                pairs.extend(zip((first + start).tolist(), second.tolist()))
+            return pairs
+
+        pairs = []
+        for i in range(count - 1):
+            for j in range(i + 1, count):
+                if (active[i] or active[j]) and self.overlaps(i, j):
+                    pairs.append((i, j))
+        return pairs
@@ -0,0 +1,33 @@
+class AxisCache:
+    # Per polygon pair, the SAT axis that decided the last test, as (0 for bodyA or 1 for bodyB, edge index).
+    # Edge indices follow the bodies as they rotate, and a hint only ever short-cuts a pair it still separates.
+    def __init__(self):
+        self.previous = {}
+        self.current = {}
+
+    def __len__(self):
+        return len(self.current)
+
+    def begin(self):
+        # Pairs that are not tested again before the next begin() are dropped.
+        self.previous = self.current
+        self.current = {}
+
+    def clear(self):
+        self.previous = {}
+        self.current = {}
+
+    def remove(self, body):
+        self.previous = {key: axis for key, axis in self.previous.items() if body not in key}
+        self.current = {key: axis for key, axis in self.current.items() if body not in key}
+
+    def get(self, bodyA, bodyB):
+        key = (bodyA, bodyB)
+        axis = self.current.get(key)
+        if axis is None:
+            axis = self.previous.get(key)
+        return axis
+
+    def update(self, bodyA, bodyB, axis):
+        if axis is not None:
+            self.current[(bodyA, bodyB)] = axis
@@ -0,0 +1,212 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from collisions import Collisions
+from shape import ShapeType
+from vector import Vector2
+
+
+class BatchCollisions:
+    @staticmethod
+    def require_numpy():
+        if np is None:
+            raise ImportError("Batched collision detection requires numpy.")
+
+    @staticmethod
+    def gather_polygons(bodies):
+        # Pads every vertex list to the longest one by repeating its last vertex, which leaves projections unchanged.
+        counts = np.array([len(body.get_transformed_vertices()) for body in bodies], dtype=np.intp)
+        max_count = int(counts.max()) if len(bodies) else 0
+
+        vertices = np.empty((len(bodies), max_count, 2), dtype=np.float64)
+        normals = np.empty((len(bodies), max_count, 2), dtype=np.float64)
+        centers = np.empty((len(bodies), 2), dtype=np.float64)
+        for index, body in enumerate(bodies):
+            transformed = body.get_transformed_vertices()
+            count = len(transformed)
+            vertices[index, :count] = [(v.x, v.y) for v in transformed]
+            vertices[index, count:] = vertices[index, count - 1]
+            normals[index, :count] = [(n.x, n.y) for n in body.get_transformed_normals()]
+            normals[index, count:] = normals[index, count - 1]
+            position = body.position
+            centers[index] = position.x, position.y
+
+        return centers, vertices, normals, counts
+
+    @staticmethod
+    def edge_normals(vertices, counts, normals=None):
+        max_count = vertices.shape[1]
+        valid = np.arange(max_count)[None, :] < counts[:, None]
+        if normals is not None:
+            return normals, valid
+
+        following = (np.arange(max_count)[None, :] + 1) % counts[:, None]
+        edges = np.take_along_axis(vertices, following[:, :, None], axis=1) - vertices
+
+        axis_x = -edges[:, :, 1]
+        axis_y = edges[:, :, 0]
+        length_squared = axis_x ** 2 + axis_y ** 2
+        with np.errstate(divide='ignore'):
+            inv_length = np.where(length_squared == 0, 0.0, 1.0 / np.sqrt(length_squared))
+
+        return np.stack((axis_x * inv_length, axis_y * inv_length), axis=-1), valid
+
+    @staticmethod
+    def project(vertices, axes):
+        projections = (vertices[:, None, :, 0] * axes[:, :, None, 0] +
+                       vertices[:, None, :, 1] * axes[:, :, None, 1])
+        return projections.min(axis=2), projections.max(axis=2)
+
+    @staticmethod
+    def intersect_polygons(centers_a, vertices_a, counts_a, centers_b, vertices_b, counts_b,
+                           normals_a=None, normals_b=None):
+        # normals_a and normals_b are the bodies' rotated edge normals, padded like the vertices.
+        BatchCollisions.require_numpy()
+
+        axes_a, valid_a = BatchCollisions.edge_normals(vertices_a, counts_a, normals_a)
+        axes_b, valid_b = BatchCollisions.edge_normals(vertices_b, counts_b, normals_b)
+        axes = np.concatenate((axes_a, axes_b), axis=1)
+        valid = np.concatenate((valid_a, valid_b), axis=1)
+
+        min_a, max_a = BatchCollisions.project(vertices_a, axes)
+        min_b, max_b = BatchCollisions.project(vertices_b, axes)
+
+        separated = ((min_a >= max_b) | (min_b >= max_a)) & valid
+        collided = ~separated.any(axis=1)
+
+        axis_depths = np.where(valid, np.minimum(max_b - min_a, max_a - min_b), np.inf)
+        # argmin keeps the first of equal depths, like the strict comparison in the scalar path.
+        best = axis_depths.argmin(axis=1)
+        rows = np.arange(len(best))
+        depths = axis_depths[rows, best]
+        normals = axes[rows, best]
+
+        direction = centers_b - centers_a
+        flip = (direction[:, 0] * normals[:, 0] + direction[:, 1] * normals[:, 1]) < 0
+        normals[flip] = -normals[flip]
+
+        normals[~collided] = 0.0
+        depths[~collided] = np.inf
+        return collided, normals, depths
+
+    @staticmethod
+    def intersect_circles(centers_a, radii_a, centers_b, radii_b):
+        BatchCollisions.require_numpy()
+
+        delta = centers_b - centers_a
+        length_squared = delta[:, 0] ** 2 + delta[:, 1] ** 2
+        distances = np.sqrt(length_squared)
+        radii = radii_a + radii_b
+        collided = distances < radii
+
+        with np.errstate(divide='ignore'):
+            inv_length = np.where(length_squared == 0, 0.0, 1.0 / distances)
+        normals = delta * inv_length[:, None]
+        depths = radii - distances
+        contacts = centers_a + normals * radii_a[:, None]
+
+        normals[~collided] = 0.0
+        depths[~collided] = 0.0
+        return collided, normals, depths, contacts
+
+    @staticmethod
+    def gather_centers(bodies):
+        store = bodies[0].store if bodies else None
+        if store is not None and all(body.store is store for body in bodies):
+            return store.position[np.array([body.store_index for body in bodies], dtype=np.intp)]
+        return np.array([(body.position.x, body.position.y) for body in bodies], dtype=np.float64).reshape(-1, 2)
+
+    @staticmethod
+    def is_polygon(body):
+        return body.shape.type is ShapeType.BOX or body.shape.type is ShapeType.POLYGON
+
+    @staticmethod
+    def bucket_pairs(bodies, pairs):
+        buckets = {}
+        for k, (i, j) in enumerate(pairs):
+            key = (BatchCollisions.is_polygon(bodies[i]), BatchCollisions.is_polygon(bodies[j]))
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [k]
+            else:
+                bucket.append(k)
+        return buckets
+
+    @staticmethod
+    def collide_pairs(bodies, pairs):
+        # Each result is (collision, normal, depth, contacts); contacts is None when they are left to the caller.
+        BatchCollisions.require_numpy()
+
+        results = [None] * len(pairs)
+        for (polygon_a, polygon_b), bucket in BatchCollisions.bucket_pairs(bodies, pairs).items():
+            if polygon_a and polygon_b:
+                BatchCollisions.collide_polygon_bucket(bodies, pairs, bucket, results)
+            elif not polygon_a and not polygon_b:
+                BatchCollisions.collide_circle_bucket(bodies, pairs, bucket, results)
+            elif polygon_b:
+                for k in bucket:
+                    bodyA = bodies[pairs[k][0]]
+                    bodyB = bodies[pairs[k][1]]
+                    collision, normal, depth = Collisions.intersect_circle_polygon(
+                        bodyA.position, bodyA.shape.radius, bodyB.position, bodyB.get_transformed_vertices(),
+                        bodyB.get_transformed_normals())
+                    results[k] = collision, normal, depth, None
+            else:
+                for k in bucket:
+                    bodyA = bodies[pairs[k][0]]
+                    bodyB = bodies[pairs[k][1]]
+                    collision, normal, depth = Collisions.intersect_circle_polygon(
+                        bodyB.position, bodyB.shape.radius, bodyA.position, bodyA.get_transformed_vertices(),
+                        bodyA.get_transformed_normals())
+                    results[k] = collision, -normal, depth, None
+
+        return results
+
+    @staticmethod
+    def collide_circle_bucket(bodies, pairs, bucket, results):
+        bodies_a = [bodies[pairs[k][0]] for k in bucket]
+        bodies_b = [bodies[pairs[k][1]] for k in bucket]
+        radii_a = np.array([body.shape.radius for body in bodies_a], dtype=np.float64)
+        radii_b = np.array([body.shape.radius for body in bodies_b], dtype=np.float64)
+
+        collided, normals, depths, contacts = BatchCollisions.intersect_circles(
+            BatchCollisions.gather_centers(bodies_a), radii_a, BatchCollisions.gather_centers(bodies_b), radii_b)
+
+        collided = collided.tolist()
+        normals = normals.tolist()
+        depths = depths.tolist()
+        contacts = contacts.tolist()
+        for n, k in enumerate(bucket):
+            if collided[n]:
+                contact = Vector2(contacts[n][0], contacts[n][1])
+                results[k] = True, Vector2(normals[n][0], normals[n][1]), depths[n], (contact, Vector2(), 1, None)
+            else:
+                results[k] = False, Vector2(), 0.0, None
+
+    @staticmethod
+    def collide_polygon_bucket(bodies, pairs, bucket, results):
+        slots = {}
+        polygon_bodies = []
+        for k in bucket:
+            for index in pairs[k]:
+                if index not in slots:
+                    slots[index] = len(polygon_bodies)
+                    polygon_bodies.append(bodies[index])
+
+        centers, vertices, normals, counts = BatchCollisions.gather_polygons(polygon_bodies)
+        a = np.array([slots[pairs[k][0]] for k in bucket], dtype=np.intp)
+        b = np.array([slots[pairs[k][1]] for k in bucket], dtype=np.intp)
+
+        collided, normals, depths = BatchCollisions.intersect_polygons(
+            centers[a], vertices[a], counts[a], centers[b], vertices[b], counts[b], normals[a], normals[b])
+
+        collided = collided.tolist()
+        normals = normals.tolist()
+        depths = depths.tolist()
+        for n, k in enumerate(bucket):
+            if collided[n]:
+                results[k] = True, Vector2(normals[n][0], normals[n][1]), depths[n], None
+            else:
+                results[k] = False, Vector2(), float('inf'), None
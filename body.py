@@ -3,7 +3,6 @@ import math
 from AABB import AABB
 from matter import Matter
 from shape import ShapeType, Box, Circle
-from transform import Transform
 from vector import Vector2
 
 
@@ -17,6 +16,7 @@ class Body:
     shape: Box | Circle
     matter: Matter
     is_static: bool
+    is_bullet: bool
 
     mass: float
     inv_mass: float
@@ -26,7 +26,15 @@ class Body:
     transform_update_required: bool
     aabb_update_required: bool
 
-    def __init__(self, shape, matter, x, y, angle=0, is_static=False):
+    is_awake: bool
+    sleep_time: float
+
+    # Counts every move and rotate on any body, so a world can tell whether bodies were moved by hand.
+    moves = 0
+
+    def __init__(self, shape, matter, x, y, angle=0, is_static=False, is_bullet=False):
+        self.store = None
+        self.store_index = -1
 
         self.position = Vector2(x, y)
         self.linear_velocity = Vector2()
@@ -37,21 +45,32 @@ class Body:
         self.shape = shape
         self.matter = matter
         self.is_static = is_static
+        # Bullets are swept against static bodies every substep so they cannot tunnel through them.
+        self.is_bullet = is_bullet
         self.mass = 0
         self.inv_mass = 0
         self.inertia = 0
         self.inv_inertia = 0
 
+        # World-space vertices are written into this buffer in place whenever the body has moved.
         if self.shape.type is ShapeType.BOX or self.shape.type is ShapeType.POLYGON:
-            self.transformed_vertices = self.shape.vertices
+            self.transformed_vertices = [v.copy() for v in self.shape.vertices]
+            self.transformed_normals = [n.copy() for n in self.shape.normals]
         else:
             self.transformed_vertices = None
+            self.transformed_normals = None
+        self.transform_angle = None
+        self.transform_sin = 0.0
+        self.transform_cos = 1.0
 
         self.AABB = None
 
         self.transform_update_required = True
         self.aabb_update_required = True
 
+        self.is_awake = True
+        self.sleep_time = 0.0
+
         self.init()
 
     def init(self):
@@ -100,14 +119,41 @@ class Body:
 
     def get_transformed_vertices(self):
         if self.transform_update_required:
-            transform = Transform(self.position.x, self.position.y, self.angle)
-
-            self.transformed_vertices = [Vector2.transform(v, transform) for v in self.shape.vertices]
-
-            self.transform_update_required = False
+            self.update_transformed_vertices()
 
         return self.transformed_vertices
 
+    def get_transformed_normals(self):
+        if self.transform_update_required:
+            self.update_transformed_vertices()
+
+        return self.transformed_normals
+
+    def update_transformed_vertices(self):
+        angle = self.angle
+        if angle != self.transform_angle:
+            self.transform_angle = angle
+            self.transform_sin = math.sin(angle)
+            self.transform_cos = math.cos(angle)
+
+            # Edge normals only depend on the rotation, so a body that only translated keeps them.
+            sin = self.transform_sin
+            cos = self.transform_cos
+            for n, out in zip(self.shape.normals, self.transformed_normals):
+                out.x = cos * n.x - sin * n.y
+                out.y = sin * n.x + cos * n.y
+
+        sin = self.transform_sin
+        cos = self.transform_cos
+        position = self.position
+        x = position.x
+        y = position.y
+        for v, out in zip(self.shape.vertices, self.transformed_vertices):
+            out.x = cos * v.x - sin * v.y + x
+            out.y = sin * v.x + cos * v.y + y
+
+        self.transform_update_required = False
+
     def get_vertices(self, tuple=False):
         if tuple:
             return [(v.x, v.y) for v in self.transformed_vertices]
@@ -159,41 +205,112 @@ class Body:
 
         dt /= iterations
 
-        acceleration = self.force / self.mass * dt
-        self.linear_velocity += acceleration
+        self.integrate_velocity(dt, gravity)
+        self.integrate_position(dt)
+
+    def integrate_velocity(self, dt, gravity):
+        if self.is_static:
+            return
+
+        # Worked on a local and assigned back, so array-backed bodies store the result.
+        velocity = self.linear_velocity
+        force = self.force
+        velocity.x += force.x / self.mass * dt
+        velocity.y += force.y / self.mass * dt
+
+        velocity.add_scaled(gravity, dt)
+        self.linear_velocity = velocity
+        self.force = Vector2()
+
+    def integrate_position(self, dt):
+        if self.is_static:
+            return
 
-        self.linear_velocity += gravity * dt
-        self.position += self.linear_velocity * dt
+        self.position = self.position.add_scaled(self.linear_velocity, dt)
 
         self.angle += self.angular_velocity * dt
 
-        self.force.zero()
         self.transform_update_required = True
         self.aabb_update_required = True
 
+    def clone(self) -> 'Body':
+        # Shares the shape and matter and copies the mutable state. Only init writes the matter, zeroing a static
+        # body's density, and a clone never runs it.
+        body = object.__new__(getattr(self, 'body_class', None) or type(self))
+        body.__dict__.update(self.__dict__)
+        body.store = None
+        body.store_index = -1
+
+        body.position = self.position.copy()
+        body.linear_velocity = self.linear_velocity.copy()
+        body.angle = self.angle
+        body.angular_velocity = self.angular_velocity
+        body.force = self.force.copy()
+        body.mass = self.mass
+        body.inv_mass = self.inv_mass
+        body.inertia = self.inertia
+        body.inv_inertia = self.inv_inertia
+        body.is_static = self.is_static
+        body.is_awake = self.is_awake
+        body.sleep_time = self.sleep_time
+
+        if self.transformed_vertices is not None:
+            body.transformed_vertices = [v.copy() for v in self.transformed_vertices]
+            body.transformed_normals = [n.copy() for n in self.transformed_normals]
+        body.transform_update_required = True
+        body.aabb_update_required = True
+        return body
+
+    def wake(self):
+        self.is_awake = True
+        self.sleep_time = 0.0
+
+    def sleep(self):
+        self.is_awake = False
+        self.sleep_time = 0.0
+        self.linear_velocity = Vector2()
+        self.angular_velocity = 0
+        self.force = Vector2()
+
     def move(self, amount):
         self.position += amount
         self.transform_update_required = True
         self.aabb_update_required = True
+        Body.moves += 1
+        if not self.is_awake:
+            self.wake()
 
     def move_to(self, pos):
-        self.position = pos
+        self.position = Vector2(pos.x, pos.y)
         self.transform_update_required = True
         self.aabb_update_required = True
+        Body.moves += 1
+        if not self.is_awake:
+            self.wake()
 
     def rotate(self, amount):
         self.angle += amount
         self.transform_update_required = True
         self.aabb_update_required = True
+        Body.moves += 1
+        if not self.is_awake:
+            self.wake()
 
     def rotate_to(self, angle):
         self.angle = angle
         self.transform_update_required = True
         self.aabb_update_required = True
+        Body.moves += 1
+        if not self.is_awake:
+            self.wake()
 
     def apply_force(self, force: Vector2):
         print(force)
         self.force += force
+        if not self.is_awake:
+            self.wake()
 
     def apply_impulse(self, impulse: Vector2):
-        self.linear_velocity += impulse
\ No newline at end of file
+        self.linear_velocity += impulse
+        if not self.is_awake:
+            self.wake()
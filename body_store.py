@@ -0,0 +1,250 @@
+import ctypes
+from operator import attrgetter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from vector import Vector2
+
+
+class StoredVector2View(ctypes.Structure):
+    # A Vector2 laid over one body's row of a store array, so reads and in-place edits such as position.x = 5 or
+    # add_scaled go straight to the array at plain-attribute speed. A view belongs to its row: take a copy to keep a
+    # value past remove_body, or past add_body when that grows the store.
+    _fields_ = [('x', ctypes.c_double), ('y', ctypes.c_double)]
+
+    def __reduce__(self):
+        return Vector2, (self.x, self.y)
+
+
+for method_name, method in vars(Vector2).items():
+    if method_name != '__init__' and (callable(method) or isinstance(method, staticmethod)):
+        setattr(StoredVector2View, method_name, method)
+
+
+class StoredVector2:
+    # Only __set__ is defined, so reading the field finds the body's view in its instance dict without a call.
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __set__(self, body, value: Vector2):
+        view = body.__dict__[self.name]
+        view.x = value.x
+        view.y = value.y
+
+
+def stored_scalar(name: str) -> property:
+    # The getter reads the body's ctypes cell over its row entirely in C.
+    cell = name + '_cell'
+
+    def set_value(body, value):
+        body.__dict__[cell].value = value
+
+    return property(attrgetter(cell + '.value'), set_value)
+
+
+class StoredFields:
+    # Mixed in front of a body's class while it lives in a BodyStore, so plain bodies keep plain attributes.
+    body_class = None
+
+    position = StoredVector2()
+    linear_velocity = StoredVector2()
+    force = StoredVector2()
+    angle = stored_scalar('angle')
+    angular_velocity = stored_scalar('angular_velocity')
+    mass = stored_scalar('mass')
+    inv_mass = stored_scalar('inv_mass')
+    inertia = stored_scalar('inertia')
+    inv_inertia = stored_scalar('inv_inertia')
+    is_static = stored_scalar('is_static')
+    transform_update_required = stored_scalar('transform_update_required')
+    aabb_update_required = stored_scalar('aabb_update_required')
+    is_awake = stored_scalar('is_awake')
+    sleep_time = stored_scalar('sleep_time')
+
+    def __reduce_ex__(self, protocol):
+        # The generated class cannot be pickled by name, so it is rebuilt from the original one on load. Views and
+        # cells are left out and laid over the unpickled arrays again by the store.
+        state = {key: value for key, value in self.__dict__.items() if key not in BodyStore.VIEW_KEYS}
+        return stored_body, (self.body_class,), state
+
+    def clone(self):
+        body = super().clone()
+        for name in BodyStore.CELL_KEYS:
+            body.__dict__.pop(name, None)
+        return body
+
+
+stored_classes = {}
+
+
+def stored_body(body_class):
+    return object.__new__(stored_class(body_class))
+
+
+def stored_class(body_class):
+    stored = stored_classes.get(body_class)
+    if stored is None:
+        stored = type('Stored' + body_class.__name__, (StoredFields, body_class), {'body_class': body_class})
+        stored_classes[body_class] = stored
+    return stored
+
+
+class BodyStore:
+    VECTOR_FIELDS = ('position', 'linear_velocity', 'force')
+    FLOAT_FIELDS = ('angle', 'angular_velocity', 'mass', 'inv_mass', 'inertia', 'inv_inertia', 'sleep_time')
+    BOOL_FIELDS = ('is_static', 'transform_update_required', 'aabb_update_required', 'is_awake')
+    CELL_TYPES = dict([(name, ctypes.c_double) for name in FLOAT_FIELDS] + [(name, ctypes.c_bool) for name in BOOL_FIELDS])
+    CELL_SIZES = {name: ctypes.sizeof(cell_type) for name, cell_type in CELL_TYPES.items()}
+    CELL_KEYS = tuple(name + '_cell' for name in FLOAT_FIELDS + BOOL_FIELDS)
+    VIEW_KEYS = VECTOR_FIELDS + CELL_KEYS
+
+    def __init__(self, capacity: int = 64):
+        if np is None:
+            raise ImportError("The array-backed body store requires numpy.")
+        if capacity < 1:
+            raise ValueError("Capacity must be a positive value.")
+
+        self.capacity = capacity
+        self.count = 0
+        self.bodies = []
+
+        for name in self.VECTOR_FIELDS:
+            setattr(self, name, np.zeros((capacity, 2), dtype=np.float64))
+        for name in self.FLOAT_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        for name in self.BOOL_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.bool_))
+        self.update_addresses()
+
+    @property
+    def field_names(self):
+        return self.VECTOR_FIELDS + self.FLOAT_FIELDS + self.BOOL_FIELDS
+
+    def grow(self, capacity: int):
+        for name in self.field_names:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
+        self.update_addresses()
+        for index, body in enumerate(self.bodies):
+            self.bind(body, index)
+
+    def bind(self, body, index: int):
+        # Lays the body's views and cells over its rows; done again whenever the arrays are replaced or the row moves.
+        # Views can be handed out, so they keep their array alive. Cells never leave the body's dict and are rebuilt
+        # with the arrays, so they sit on raw addresses, which keeps each one a single object for the collector.
+        state = body.__dict__
+        for name in self.VECTOR_FIELDS:
+            state[name] = StoredVector2View.from_buffer(getattr(self, name)[index])
+        for name, address in self.addresses.items():
+            state[name + '_cell'] = self.CELL_TYPES[name].from_address(address + index * self.CELL_SIZES[name])
+
+    def update_addresses(self):
+        self.addresses = {name: getattr(self, name).ctypes.data for name in self.FLOAT_FIELDS + self.BOOL_FIELDS}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.update_addresses()
+        for index, body in enumerate(self.bodies):
+            self.bind(body, index)
+
+    def add(self, body):
+        if body.store is not None:
+            raise ValueError("Body already belongs to a body store.")
+
+        if self.count == self.capacity:
+            self.grow(self.capacity * 2)
+
+        index = self.count
+        for name in self.VECTOR_FIELDS:
+            value = body.__dict__.pop(name)
+            row = getattr(self, name)[index]
+            row[0] = value.x
+            row[1] = value.y
+        for name in self.FLOAT_FIELDS + self.BOOL_FIELDS:
+            getattr(self, name)[index] = body.__dict__.pop(name)
+
+        body.store = self
+        body.store_index = index
+        body.__class__ = stored_class(type(body))
+        self.bind(body, index)
+        self.bodies.append(body)
+        self.count += 1
+
+    def remove(self, body):
+        if body.store is not self:
+            raise ValueError("Body does not belong to this body store.")
+
+        values = {name: getattr(body, name) for name in self.FLOAT_FIELDS + self.BOOL_FIELDS}
+        # The views stay over the rows, so the body takes plain copies with it.
+        values.update((name, getattr(body, name).copy()) for name in self.VECTOR_FIELDS)
+
+        index = body.store_index
+        last = self.count - 1
+        if index != last:
+            for name in self.field_names:
+                array = getattr(self, name)
+                array[index] = array[last]
+            moved = self.bodies[last]
+            moved.store_index = index
+            self.bind(moved, index)
+            self.bodies[index] = moved
+
+        self.bodies.pop()
+        self.count -= 1
+
+        body.__class__ = body.body_class
+        body.store = None
+        body.store_index = -1
+        for name in self.CELL_KEYS:
+            del body.__dict__[name]
+        body.__dict__.update(values)
+
+    def integrate(self, dt: float, gravity: Vector2, damping: float, iterations: int, rows=None):
+        self.integrate_velocities(dt, gravity, damping, iterations, rows)
+        self.integrate_positions(dt / iterations, rows)
+
+    def transform_dirty_bodies(self, rows):
+        return [self.bodies[row] for row in rows[self.transform_update_required[rows]].tolist()]
+
+    def active_rows(self, rows=None):
+        # Every awake dynamic row, or only those among rows when the store is shared between worlds.
+        if rows is None:
+            return np.flatnonzero(~self.is_static[:self.count] & self.is_awake[:self.count])
+        return rows[~self.is_static[rows] & self.is_awake[rows]]
+
+    def integrate_velocities(self, dt: float, gravity: Vector2, damping: float, iterations: int, rows=None):
+        active = self.active_rows(rows)
+        if active.size == 0:
+            return
+
+        sub_dt = dt / iterations
+
+        velocity = self.linear_velocity[active]
+        velocity *= 1 - damping * dt
+        velocity += self.force[active] / self.mass[active, None] * sub_dt
+        velocity[:, 0] += gravity.x * sub_dt
+        velocity[:, 1] += gravity.y * sub_dt
+
+        self.linear_velocity[active] = velocity
+        self.force[active] = 0.0
+
+    def integrate_positions(self, dt: float, rows=None):
+        active = self.active_rows(rows)
+        if active.size == 0:
+            return
+
+        self.position[active] += self.linear_velocity[active] * dt
+        self.angle[active] += self.angular_velocity[active] * dt
+
+        self.transform_update_required[active] = True
+        self.aabb_update_required[active] = True
+
+    def clear(self):
+        for body in list(reversed(self.bodies)):
+            self.remove(body)
@@ -0,0 +1,291 @@
+import math
+from typing import List, Tuple
+
+from AABB import AABB, AABBArray
+from dynamic_tree import DynamicTree
+
+
+class BroadPhase:
+    def find_pairs(self, bodies, bounds: AABBArray) -> List[Tuple[int, int]]:
+        # Row k of bounds holds the refreshed AABB of bodies[k].
+        raise NotImplementedError
+
+    @staticmethod
+    def is_active(body) -> bool:
+        return not body.is_static and body.is_awake
+
+    def clone(self) -> 'BroadPhase':
+        # A new, empty broad phase with the same settings.
+        return type(self)()
+
+
+class StaticIndex:
+    def __init__(self):
+        self.tree = DynamicTree(margin=0.0)
+        self.proxies = {}
+
+    def add(self, body):
+        body.AABB = body.get_AABB()
+        self.proxies[body] = self.tree.insert(body.AABB, body)
+
+    def remove(self, body):
+        leaf = self.proxies.pop(body, None)
+        if leaf is not None:
+            self.tree.remove(leaf)
+
+    def clear(self):
+        self.tree = DynamicTree(margin=0.0)
+        self.proxies.clear()
+
+    def move(self, body) -> AABB | None:
+        # Static AABBs stay cached until the body is moved or rotated, then the world's bounds pass moves the leaf.
+        # Returns the AABB the body was indexed under before the move.
+        leaf = self.proxies.get(body)
+        if leaf is None:
+            return None
+        previous = leaf.aabb
+        self.tree.move(leaf, body.AABB)
+        return previous
+
+    def query(self, aabb):
+        return self.tree.query(aabb)
+
+    def query_point(self, x, y):
+        return self.tree.query_point(x, y)
+
+    def raycast(self, p1, p2, callback, max_fraction: float = 1.0):
+        self.tree.raycast(p1, p2, callback, max_fraction)
+
+
+class BruteForceBroadPhase(BroadPhase):
+    def find_pairs(self, bodies, bounds):
+        return bounds.overlapping_pairs([BroadPhase.is_active(body) for body in bodies])
+
+
+class SpatialHashGrid(BroadPhase):
+    def __init__(self, cell_size: float = 64.0):
+        if cell_size <= 0:
+            raise ValueError("Cell size must be a positive value.")
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def clone(self):
+        return SpatialHashGrid(self.cell_size)
+
+    def cell_range(self, min_x, min_y, max_x, max_y):
+        inv = 1.0 / self.cell_size
+        return (math.floor(min_x * inv), math.floor(min_y * inv),
+                math.floor(max_x * inv), math.floor(max_y * inv))
+
+    def find_pairs(self, bodies, bounds):
+        cells = self.cells
+        cells.clear()
+        ranges = []
+        active = [BroadPhase.is_active(body) for body in bodies]
+
+        for index in range(len(bodies)):
+            cell_range = self.cell_range(bounds.min_x[index], bounds.min_y[index],
+                                         bounds.max_x[index], bounds.max_y[index])
+            ranges.append(cell_range)
+            min_cx, min_cy, max_cx, max_cy = cell_range
+
+            for cx in range(min_cx, max_cx + 1):
+                for cy in range(min_cy, max_cy + 1):
+                    cell = cells.get((cx, cy))
+                    if cell is None:
+                        cells[(cx, cy)] = [index]
+                    else:
+                        cell.append(index)
+
+        pairs = []
+        for (cx, cy), indices in cells.items():
+            count = len(indices)
+            if count < 2:
+                continue
+
+            for a in range(count - 1):
+                i = indices[a]
+                range_a = ranges[i]
+
+                for b in range(a + 1, count):
+                    j = indices[b]
+
+                    if not active[i] and not active[j]:
+                        continue
+
+                    # A pair sharing several cells is only reported from the first cell of their overlap.
+                    range_b = ranges[j]
+                    if cx != max(range_a[0], range_b[0]) or cy != max(range_a[1], range_b[1]):
+                        continue
+
+                    if not bounds.overlaps(i, j):
+                        continue
+
+                    pairs.append((i, j))
+
+        pairs.sort()
+        return pairs
+
+
+class SweepAndPrune(BroadPhase):
+    class Endpoint:
+        def __init__(self, proxy, is_min):
+            self.proxy = proxy
+            self.is_min = is_min
+            self.value = 0.0
+
+    class Proxy:
+        def __init__(self, body, proxy_id):
+            self.body = body
+            self.id = proxy_id
+            self.min = SweepAndPrune.Endpoint(self, True)
+            self.max = SweepAndPrune.Endpoint(self, False)
+
+    def __init__(self, axis: int = 0):
+        if axis not in (0, 1):
+            raise ValueError("Axis must be 0 (x) or 1 (y).")
+        self.axis = axis
+        self.endpoints: List[SweepAndPrune.Endpoint] = []
+        self.proxies = {}
+        self.next_proxy_id = 0
+
+        self.axis_overlaps = set()
+
+    def clone(self):
+        return SweepAndPrune(self.axis)
+
+    @staticmethod
+    def pair_key(proxy_a, proxy_b):
+        return (proxy_a, proxy_b) if proxy_a.id < proxy_b.id else (proxy_b, proxy_a)
+
+    def sync_proxies(self, bodies):
+        live = set(bodies)
+        dead = [proxy for body, proxy in self.proxies.items() if body not in live]
+        if dead:
+            for proxy in dead:
+                del self.proxies[proxy.body]
+            dead = set(dead)
+            self.endpoints = [e for e in self.endpoints if e.proxy not in dead]
+            self.axis_overlaps = {key for key in self.axis_overlaps if key[0] not in dead and key[1] not in dead}
+
+        for body in bodies:
+            if body not in self.proxies:
+                proxy = SweepAndPrune.Proxy(body, self.next_proxy_id)
+                self.next_proxy_id += 1
+                self.proxies[body] = proxy
+                # New endpoints start at the end and the insertion sort finds their overlaps.
+                self.endpoints.append(proxy.min)
+                self.endpoints.append(proxy.max)
+
+    def update_axis_overlap(self, proxy_a, proxy_b):
+        key = SweepAndPrune.pair_key(proxy_a, proxy_b)
+        if proxy_a.min.value < proxy_b.max.value and proxy_b.min.value < proxy_a.max.value:
+            self.axis_overlaps.add(key)
+        else:
+            self.axis_overlaps.discard(key)
+
+    def sort_endpoints(self):
+        endpoints = self.endpoints
+        for k in range(1, len(endpoints)):
+            endpoint = endpoints[k]
+            value = endpoint.value
+            is_min = endpoint.is_min
+
+            j = k - 1
+            while j >= 0:
+                other = endpoints[j]
+                # At equal values max endpoints sort first, so touching intervals do not overlap.
+                if other.value < value or (other.value == value and other.is_min <= is_min):
+                    break
+
+                if other.is_min != is_min and other.proxy is not endpoint.proxy:
+                    self.update_axis_overlap(endpoint.proxy, other.proxy)
+
+                endpoints[j + 1] = other
+                j -= 1
+
+            endpoints[j + 1] = endpoint
+
+    def find_pairs(self, bodies, bounds):
+        self.sync_proxies(bodies)
+
+        lower, upper = (bounds.min_x, bounds.max_x) if self.axis == 0 else (bounds.min_y, bounds.max_y)
+        indices = {}
+        active = []
+        for index, body in enumerate(bodies):
+            proxy = self.proxies[body]
+            proxy.min.value = lower[index]
+            proxy.max.value = upper[index]
+            indices[body] = index
+            active.append(BroadPhase.is_active(body))
+
+        self.sort_endpoints()
+
+        pairs = []
+        for key in self.axis_overlaps:
+            i = indices[key[0].body]
+            j = indices[key[1].body]
+
+            if not active[i] and not active[j]:
+                continue
+
+            if not bounds.overlaps(i, j):
+                continue
+
+            pairs.append((i, j) if i < j else (j, i))
+
+        pairs.sort()
+        return pairs
+
+
+class DynamicTreeBroadPhase(BroadPhase):
+    def __init__(self, margin: float = 2.0):
+        self.tree = DynamicTree(margin)
+        self.proxies = {}
+
+    def clone(self):
+        return DynamicTreeBroadPhase(self.tree.margin)
+
+    def sync_proxies(self, bodies):
+        live = set(bodies)
+        for body in [body for body in self.proxies if body not in live]:
+            self.tree.remove(self.proxies.pop(body))
+
+        for body in bodies:
+            proxy = self.proxies.get(body)
+            if proxy is None:
+                self.proxies[body] = self.tree.insert(body.AABB, body)
+            else:
+                self.tree.move(proxy, body.AABB)
+
+    def find_pairs(self, bodies, bounds):
+        self.sync_proxies(bodies)
+
+        indices = {body: index for index, body in enumerate(bodies)}
+        pairs = []
+        for i, bodyA in enumerate(bodies):
+            if not BroadPhase.is_active(bodyA):
+                continue
+
+            for bodyB in self.tree.query(bodyA.AABB):
+                j = indices[bodyB]
+                # Pairs of active bodies are found from both sides, the others only from the active side.
+                if j == i or (j < i and BroadPhase.is_active(bodyB)):
+                    continue
+
+                if not bounds.overlaps(i, j):
+                    continue
+
+                pairs.append((i, j) if i < j else (j, i))
+
+        pairs.sort()
+        return pairs
+
+    def query_aabb(self, aabb):
+        return self.tree.query(aabb)
+
+    def query_point(self, x, y):
+        return self.tree.query_point(x, y)
+
+    def raycast(self, p1, p2, callback, max_fraction: float = 1.0):
+        self.tree.raycast(p1, p2, callback, max_fraction)
@@ -7,11 +7,11 @@ from vector import Vector2
 class Collisions:
     @staticmethod
     def point_segment_distance(p, a, b):
-        ab = b - a
-        ap = p - a
+        ab_x = b.x - a.x
+        ab_y = b.y - a.y
 
-        proj = Vector2.dot(ap, ab)
-        ab_len_sq = Vector2.length_squared(ab)
+        proj = (p.x - a.x) * ab_x + (p.y - a.y) * ab_y
+        ab_len_sq = ab_x ** 2 + ab_y ** 2
         d = proj / ab_len_sq
 
         if d <= 0:
@@ -19,10 +19,11 @@ class Collisions:
         elif d >= 1:
             cp = b
         else:
-            cp = a + ab * d
+            cp = Vector2(a.x + ab_x * d, a.y + ab_y * d)
 
-        distance_squared = Vector2.distance_squared(p, cp)
-        return distance_squared, cp
+        dx = p.x - cp.x
+        dy = p.y - cp.y
+        return dx ** 2 + dy ** 2, cp
 
     @staticmethod
     def intersect_aabbs(a, b):
@@ -32,7 +33,13 @@ class Collisions:
         return True
 
     @staticmethod
-    def find_contact_points(bodyA, bodyB):
+    def is_polygon(body):
+        return body.shape.type is ShapeType.BOX or body.shape.type is ShapeType.POLYGON
+
+    @staticmethod
+    def find_contact_points(bodyA, bodyB, normal=None, axis=None):
+        # Returns (contact1, contact2, contact_count, ids); ids is None for contacts involving a circle.
+        # Polygon pairs are clipped and need the collision normal, plus the SAT axis when the caller has it.
         contact1 = Vector2()
         contact2 = Vector2()
         contact_count = 0
@@ -42,8 +49,9 @@ class Collisions:
 
         if shape_type_a == ShapeType.BOX or shape_type_a == ShapeType.POLYGON:
             if shape_type_b == ShapeType.BOX or shape_type_b == ShapeType.POLYGON:
-                contact1, contact2, contact_count = Collisions.find_polygons_contact_points(
-                    bodyA.get_transformed_vertices(), bodyB.get_transformed_vertices())
+                if normal is None:
+                    raise ValueError("Polygon contacts need the collision normal.")
+                return Collisions.clip_polygons(bodyA, bodyB, normal, axis)
             elif shape_type_b == ShapeType.CIRCLE:
                 contact1 = Collisions.find_circle_polygon_contact_point(
                     bodyB.position, bodyB.shape.radius, bodyA.position, bodyA.get_transformed_vertices())
@@ -58,54 +66,109 @@ class Collisions:
                     bodyA.position, bodyA.shape.radius, bodyB.position)
                 contact_count = 1
 
-        return contact1, contact2, contact_count
+        return contact1, contact2, contact_count, None
 
     @staticmethod
-    def nearly_equal(vec1, vec2, rel_tol=1e-9, abs_tol=1e-9):
-        return (math.isclose(vec1.x, vec2.x, rel_tol=rel_tol, abs_tol=abs_tol) and
-                math.isclose(vec1.y, vec2.y, rel_tol=rel_tol, abs_tol=abs_tol))
+    def contact_id(flip, reference_edge, incident_edge, feature):
+        # feature: 0 and 1 for the incident edge's own vertices, 2 and 3 where a side plane of the reference edge cut it.
+        return ((flip * 256 + reference_edge) * 256 + incident_edge) * 4 + feature
 
     @staticmethod
-    def find_polygons_contact_points(vertices_a, vertices_b):
-        contact1 = Vector2()
-        contact2 = Vector2()
-        contact_count = 0
-
-        min_dist_sq = float('inf')
-
-        for p in vertices_a:
-            for i in range(len(vertices_b)):
-                va = vertices_b[i]
-                vb = vertices_b[(i + 1) % len(vertices_b)]
+    def best_face(normals, direction_x, direction_y):
+        best = 0
+        best_dot = float('-inf')
+        for i in range(len(normals)):
+            n = normals[i]
+            dot = n.x * direction_x + n.y * direction_y
+            if dot > best_dot:
+                best_dot = dot
+                best = i
+        return best, best_dot
 
-                dist_sq, cp = Collisions.point_segment_distance(p, va, vb)
+    @staticmethod
+    def clip_polygons(bodyA, bodyB, normal, axis=None):
+        # Reference/incident face clipping on the overlapping pose. The reference body is the SAT axis owner when it
+        # is known, else the body with a face best aligned with the normal. Points sit halfway between the incident
+        # vertex and the reference face, so they stay on the contact once the bodies are pushed apart.
+        normals_a = bodyA.get_transformed_normals()
+        normals_b = bodyB.get_transformed_normals()
+        reference_a, dot_a = Collisions.best_face(normals_a, normal.x, normal.y)
+        reference_b, dot_b = Collisions.best_face(normals_b, -normal.x, -normal.y)
+
+        if axis is not None:
+            flip = axis[0]
+        else:
+            flip = 0 if dot_a >= dot_b else 1
 
-                if math.isclose(dist_sq, min_dist_sq):
-                    if not Collisions.nearly_equal(cp, contact1):
-                        contact2 = cp
-                        contact_count = 2
-                elif dist_sq < min_dist_sq:
-                    min_dist_sq = dist_sq
-                    contact_count = 1
-                    contact1 = cp
+        if flip == 0:
+            reference_body, incident_body, reference_edge = bodyA, bodyB, reference_a
+        else:
+            reference_body, incident_body, reference_edge = bodyB, bodyA, reference_b
+
+        reference_vertices = reference_body.get_transformed_vertices()
+        reference_normal = reference_body.get_transformed_normals()[reference_edge]
+        nx = reference_normal.x
+        ny = reference_normal.y
+
+        incident_normals = incident_body.get_transformed_normals()
+        incident_edge, _ = Collisions.best_face(incident_normals, -nx, -ny)
+        incident_vertices = incident_body.get_transformed_vertices()
+        count = len(incident_vertices)
+        i1 = incident_vertices[incident_edge]
+        i2 = incident_vertices[(incident_edge + 1) % count]
+
+        v1 = reference_vertices[reference_edge]
+        v2 = reference_vertices[(reference_edge + 1) % len(reference_vertices)]
+        inv_length = 1.0 / reference_body.shape.edge_lengths[reference_edge]
+        tx = (v2.x - v1.x) * inv_length
+        ty = (v2.y - v1.y) * inv_length
+
+        front = nx * v1.x + ny * v1.y
+        edge = [(i1.x, i1.y, 0), (i2.x, i2.y, 1)]
+
+        # Each point is (x, y, feature); the segment is clipped to the side planes through v1 and v2.
+        points = Collisions.clip_segment(edge, -tx, -ty, -(tx * v1.x + ty * v1.y), 2)
+        if len(points) == 2:
+            points = Collisions.clip_segment(points, tx, ty, tx * v2.x + ty * v2.y, 3)
+
+        contacts = []
+        ids = []
+        if len(points) == 2:
+            for x, y, feature in points:
+                separation = nx * x + ny * y - front
+                if separation <= 0:
+                    half = separation * 0.5
+                    contacts.append(Vector2(x - nx * half, y - ny * half))
+                    ids.append(Collisions.contact_id(flip, reference_edge, incident_edge, feature))
+
+        if not contacts:
+            # Corner cases the clip misses still get the deepest incident vertex, which is an end of that edge.
+            x, y, feature = min(edge, key=lambda point: nx * point[0] + ny * point[1])
+            half = (nx * x + ny * y - front) * 0.5
+            return Vector2(x - nx * half, y - ny * half), Vector2(), 1, [
+                Collisions.contact_id(flip, reference_edge, incident_edge, feature)]
+        if len(contacts) == 1:
+            return contacts[0], Vector2(), 1, ids
+        return contacts[0], contacts[1], 2, ids
 
-        for p in vertices_b:
-            for i in range(len(vertices_a)):
-                va = vertices_a[i]
-                vb = vertices_a[(i + 1) % len(vertices_a)]
+    @staticmethod
+    def clip_segment(points, nx, ny, offset, feature):
+        # Keeps the part of a two-point segment with n . p <= offset; a cut point takes the given feature.
+        (x1, y1, f1), (x2, y2, f2) = points
+        distance1 = nx * x1 + ny * y1 - offset
+        distance2 = nx * x2 + ny * y2 - offset
 
-                dist_sq, cp = Collisions.point_segment_distance(p, va, vb)
+        clipped = []
+        if distance1 <= 0:
+            clipped.append(points[0])
+        if distance2 <= 0:
+            clipped.append(points[1])
 
-                if math.isclose(dist_sq, min_dist_sq):
-                    if not Collisions.nearly_equal(cp, contact1):
-                        contact2 = cp
-                        contact_count = 2
-                elif dist_sq < min_dist_sq:
-                    min_dist_sq = dist_sq
-                    contact_count = 1
-                    contact1 = cp
+        if distance1 * distance2 < 0:
+            t = distance1 / (distance1 - distance2)
+            clipped.append((x1 + t * (x2 - x1), y1 + t * (y2 - y1), feature))
 
-        return contact1, contact2, contact_count
+        return clipped
 
     @staticmethod
     def find_circle_polygon_contact_point(circle_center, circle_radius, polygon_center, polygon_vertices):
@@ -122,7 +185,7 @@ class Collisions:
                 min_dist_sq = dist_sq
                 cp = contact
 
-        return cp
+        return cp.copy()
 
     @staticmethod
     def find_circles_contact_point(center_a, radius_a, center_b):
@@ -132,7 +195,7 @@ class Collisions:
         return cp
 
     @staticmethod
-    def collide(body_a, body_b):
+    def collide(body_a, body_b, axis_cache=None):
         normal = Vector2()
         depth = 0.0
 
@@ -141,20 +204,31 @@ class Collisions:
 
         if shape_type_a == ShapeType.BOX or shape_type_a == ShapeType.POLYGON:
             if shape_type_b == ShapeType.BOX or shape_type_b == ShapeType.POLYGON:
-                return Collisions.intersect_polygons(
-                    body_a.position, body_a.get_transformed_vertices(),
-                    body_b.position, body_b.get_transformed_vertices())
+                if not Collisions.bounding_circles_overlap(body_a, body_b):
+                    return False, normal, depth
+                if axis_cache is None:
+                    return Collisions.intersect_polygons(
+                        body_a.position, body_a.get_transformed_vertices(),
+                        body_b.position, body_b.get_transformed_vertices(),
+                        body_a.get_transformed_normals(), body_b.get_transformed_normals())
+
+                result, normal, depth, axis = Collisions.intersect_polygons_axis(
+                    body_a.position, body_a.get_transformed_vertices(), body_a.get_transformed_normals(),
+                    body_b.position, body_b.get_transformed_vertices(), body_b.get_transformed_normals(),
+                    axis_cache.get(body_a, body_b))
+                axis_cache.update(body_a, body_b, axis)
+                return result, normal, depth
             elif shape_type_b == ShapeType.CIRCLE:
                 result, normal, depth = Collisions.intersect_circle_polygon(
                     body_b.position, body_b.shape.radius,
-                    body_a.position, body_a.get_transformed_vertices())
+                    body_a.position, body_a.get_transformed_vertices(), body_a.get_transformed_normals())
                 normal = -normal
                 return result, normal, depth
         elif shape_type_a == ShapeType.CIRCLE:
             if shape_type_b == ShapeType.BOX or shape_type_b == ShapeType.POLYGON:
                 return Collisions.intersect_circle_polygon(
                     body_a.position, body_a.shape.radius,
-                    body_b.position, body_b.get_transformed_vertices())
+                    body_b.position, body_b.get_transformed_vertices(), body_b.get_transformed_normals())
             elif shape_type_b == ShapeType.CIRCLE:
                 return Collisions.intersect_circles(
                     body_a.position, body_a.shape.radius,
@@ -163,17 +237,24 @@ class Collisions:
         return False, normal, depth
 
     @staticmethod
-    def intersect_circle_polygon(circle_center, circle_radius, polygon_center, vertices):
+    def bounding_circles_overlap(body_a, body_b):
+        # Shapes are centred on their body, so bodies further apart than their bounding radii cannot touch.
+        dx = body_b.position.x - body_a.position.x
+        dy = body_b.position.y - body_a.position.y
+        radii = body_a.shape.bounding_radius + body_b.shape.bounding_radius
+        return dx ** 2 + dy ** 2 < radii ** 2
+
+    @staticmethod
+    def intersect_circle_polygon(circle_center, circle_radius, polygon_center, vertices, normals=None):
+        # normals are the polygon's rotated edge normals; without them each edge normal is rebuilt from its vertices.
         normal = Vector2()
         depth = float('inf')
 
         for i in range(len(vertices)):
-            va = vertices[i]
-            vb = vertices[(i + 1) % len(vertices)]
-
-            edge = vb - va
-            axis = Vector2(-edge.y, edge.x)
-            axis = Vector2.normalize(axis)
+            if normals is not None:
+                axis = normals[i]
+            else:
+                axis = Collisions.edge_normal(vertices[i], vertices[(i + 1) % len(vertices)])
 
             min_a, max_a = Collisions.project_vertices(vertices, axis)
             min_b, max_b = Collisions.project_circle(circle_center, circle_radius, axis)
@@ -207,8 +288,11 @@ class Collisions:
 
         direction = polygon_center - circle_center
 
+        # The chosen axis may be an entry of the body's normal buffer, so the result is always a new vector.
         if Vector2.dot(direction, normal) < 0:
             normal = -normal
+        else:
+            normal = normal.copy()
 
         return True, normal, depth
 
@@ -217,9 +301,13 @@ class Collisions:
         result = -1
         min_distance = float('inf')
 
+        center_x = circle_center.x
+        center_y = circle_center.y
         for i in range(len(vertices)):
             v = vertices[i]
-            distance = Vector2.distance(v, circle_center)
+            dx = v.x - center_x
+            dy = v.y - center_y
+            distance = math.sqrt(dx ** 2 + dy ** 2)
 
             if distance < min_distance:
                 min_distance = distance
@@ -229,14 +317,18 @@ class Collisions:
 
     @staticmethod
     def project_circle(center, radius, axis):
-        direction = Vector2.normalize(axis)
-        direction_and_radius = direction * radius
-
-        p1 = center + direction_and_radius
-        p2 = center - direction_and_radius
+        axis_x = axis.x
+        axis_y = axis.y
+        length_squared = axis_x ** 2 + axis_y ** 2
+        if length_squared == 0:
+            offset_x = offset_y = 0
+        else:
+            inv_length = 1.0 / math.sqrt(length_squared)
+            offset_x = axis_x * inv_length * radius
+            offset_y = axis_y * inv_length * radius
 
-        min_proj = Vector2.dot(p1, axis)
-        max_proj = Vector2.dot(p2, axis)
+        min_proj = (center.x + offset_x) * axis_x + (center.y + offset_y) * axis_y
+        max_proj = (center.x - offset_x) * axis_x + (center.y - offset_y) * axis_y
 
         if min_proj > max_proj:
             min_proj, max_proj = max_proj, min_proj
@@ -244,64 +336,92 @@ class Collisions:
         return min_proj, max_proj
 
     @staticmethod
-    def intersect_polygons(center_a, vertices_a, center_b, vertices_b):
-        normal = Vector2()
-        depth = float('inf')
-
-        for i in range(len(vertices_a)):
-            va = vertices_a[i]
-            vb = vertices_a[(i + 1) % len(vertices_a)]
+    def intersect_polygons(center_a, vertices_a, center_b, vertices_b, normals_a=None, normals_b=None):
+        # normals are the bodies' rotated edge normals; without them they are rebuilt from the vertices.
+        if normals_a is None:
+            normals_a = Collisions.edge_normals(vertices_a)
+        if normals_b is None:
+            normals_b = Collisions.edge_normals(vertices_b)
 
-            edge = vb - va
-            axis = Vector2(-edge.y, edge.x)
-            axis = Vector2.normalize(axis)
+        collision, normal, depth, _ = Collisions.intersect_polygons_axis(
+            center_a, vertices_a, normals_a, center_b, vertices_b, normals_b)
+        return collision, normal, depth
 
-            min_a, max_a = Collisions.project_vertices(vertices_a, axis)
-            min_b, max_b = Collisions.project_vertices(vertices_b, axis)
+    @staticmethod
+    def intersect_polygons_axis(center_a, vertices_a, normals_a, center_b, vertices_b, normals_b, hint=None):
+        # Also returns the deciding axis as (0 for A or 1 for B, edge index): the separating one, else the shallowest.
+        # A hint from the previous step is tried first, which rejects a pair that is still apart with one projection.
+        hint_axis = None
+        if hint is not None:
+            hint_axis = (normals_a if hint[0] == 0 else normals_b)[hint[1]]
+            min_a, max_a = Collisions.project_vertices(vertices_a, hint_axis)
+            min_b, max_b = Collisions.project_vertices(vertices_b, hint_axis)
 
             if min_a >= max_b or min_b >= max_a:
-                return False, normal, depth
+                return False, Vector2(), float('inf'), hint
 
-            axis_depth = min(max_b - min_a, max_a - min_b)
+            hint_depth = min(max_b - min_a, max_a - min_b)
 
-            if axis_depth < depth:
-                depth = axis_depth
-                normal = axis
+        normal = Vector2()
+        depth = float('inf')
+        best = None
 
-        for i in range(len(vertices_b)):
-            va = vertices_b[i]
-            vb = vertices_b[(i + 1) % len(vertices_b)]
+        for owner, normals in ((0, normals_a), (1, normals_b)):
+            for i in range(len(normals)):
+                axis = normals[i]
 
-            edge = vb - va
-            axis = Vector2(-edge.y, edge.x)
-            axis = Vector2.normalize(axis)
+                # The hinted axis was already projected, so only its depth takes part in the search.
+                if axis is hint_axis:
+                    axis_depth = hint_depth
+                else:
+                    min_a, max_a = Collisions.project_vertices(vertices_a, axis)
+                    min_b, max_b = Collisions.project_vertices(vertices_b, axis)
 
-            min_a, max_a = Collisions.project_vertices(vertices_a, axis)
-            min_b, max_b = Collisions.project_vertices(vertices_b, axis)
+                    if min_a >= max_b or min_b >= max_a:
+                        return False, normal, depth, (owner, i)
 
-            if min_a >= max_b or min_b >= max_a:
-                return False, normal, depth
+                    axis_depth = min(max_b - min_a, max_a - min_b)
 
-            axis_depth = min(max_b - min_a, max_a - min_b)
-
-            if axis_depth < depth:
-                depth = axis_depth
-                normal = axis
+                if axis_depth < depth:
+                    depth = axis_depth
+                    normal = axis
+                    best = (owner, i)
 
         direction = center_b - center_a
 
+        # The chosen axis is an entry of a normal buffer, so the result is always a new vector.
         if Vector2.dot(direction, normal) < 0:
             normal = -normal
+        else:
+            normal = normal.copy()
 
-        return True, normal, depth
+        return True, normal, depth, best
+
+    @staticmethod
+    def edge_normals(vertices):
+        count = len(vertices)
+        return [Collisions.edge_normal(vertices[i], vertices[(i + 1) % count]) for i in range(count)]
+
+    @staticmethod
+    def edge_normal(va, vb):
+        # Unit normal (-edge.y, edge.x) of the edge va -> vb, built without the intermediate vectors.
+        axis_x = va.y - vb.y
+        axis_y = vb.x - va.x
+        length_squared = axis_x ** 2 + axis_y ** 2
+        if length_squared == 0:
+            return Vector2(0, 0)
+        inv_length = 1.0 / math.sqrt(length_squared)
+        return Vector2(axis_x * inv_length, axis_y * inv_length)
 
     @staticmethod
     def project_vertices(vertices, axis):
         min_proj = float('inf')
         max_proj = float('-inf')
 
+        axis_x = axis.x
+        axis_y = axis.y
         for v in vertices:
-            proj = Vector2.dot(v, axis)
+            proj = v.x * axis_x + v.y * axis_y
             if proj < min_proj:
                 min_proj = proj
             if proj > max_proj:
@@ -323,4 +443,340 @@ class Collisions:
         normal = Vector2.normalize(center_b - center_a)
         depth = radii - distance
 
-        return True, normal, depth
\ No newline at end of file
+        return True, normal, depth
+
+    @staticmethod
+    def raycast(body, p1, p2, max_fraction=1.0):
+        # Returns (hit, normal, fraction) for the segment p1 + t * (p2 - p1) with t in [0, max_fraction].
+        shape_type = body.shape.type
+
+        if shape_type == ShapeType.BOX or shape_type == ShapeType.POLYGON:
+            return Collisions.raycast_polygon(
+                body.get_transformed_vertices(), body.get_transformed_normals(), p1, p2, max_fraction)
+        elif shape_type == ShapeType.CIRCLE:
+            return Collisions.raycast_circle(body.position, body.shape.radius, p1, p2, max_fraction)
+
+        return False, Vector2(), 0.0
+
+    @staticmethod
+    def raycast_circle(center, radius, p1, p2, max_fraction=1.0):
+        # Smallest root of |s + t * r| = radius; a ray starting inside the circle does not hit it.
+        sx = p1.x - center.x
+        sy = p1.y - center.y
+        b = sx * sx + sy * sy - radius * radius
+        if b < 0.0:
+            return False, Vector2(), 0.0
+
+        rx = p2.x - p1.x
+        ry = p2.y - p1.y
+        c = sx * rx + sy * ry
+        rr = rx * rx + ry * ry
+        sigma = c * c - rr * b
+        if sigma < 0.0 or rr == 0.0:
+            return False, Vector2(), 0.0
+
+        a = -(c + math.sqrt(sigma))
+        if a < 0.0 or a > max_fraction * rr:
+            return False, Vector2(), 0.0
+
+        fraction = a / rr
+        normal = Vector2(sx + rx * fraction, sy + ry * fraction).normalize()
+        return True, normal, fraction
+
+    @staticmethod
+    def raycast_polygon(vertices, normals, p1, p2, max_fraction=1.0):
+        # Clips the segment against every edge's half-plane; normals must point outward, as the shapes store them.
+        rx = p2.x - p1.x
+        ry = p2.y - p1.y
+        lower = 0.0
+        upper = max_fraction
+        index = -1
+
+        for i in range(len(vertices)):
+            n = normals[i]
+            v = vertices[i]
+            numerator = n.x * (v.x - p1.x) + n.y * (v.y - p1.y)
+            denominator = n.x * rx + n.y * ry
+
+            if denominator == 0.0:
+                if numerator < 0.0:
+                    return False, Vector2(), 0.0
+            elif denominator < 0.0 and numerator < lower * denominator:
+                # Entering this half-plane later than any edge so far.
+                lower = numerator / denominator
+                index = i
+            elif denominator > 0.0 and numerator < upper * denominator:
+                upper = numerator / denominator
+
+            if upper < lower:
+                return False, Vector2(), 0.0
+
+        # No entering edge means the ray started inside the polygon.
+        if index < 0:
+            return False, Vector2(), 0.0
+
+        return True, normals[index].copy(), lower
+
+    @staticmethod
+    def contains_point(body, point):
+        # Points on the boundary count as contained.
+        shape_type = body.shape.type
+
+        if shape_type == ShapeType.BOX or shape_type == ShapeType.POLYGON:
+            # Inside a convex polygon means behind every outward edge normal.
+            for v, n in zip(body.get_transformed_vertices(), body.get_transformed_normals()):
+                if n.x * (point.x - v.x) + n.y * (point.y - v.y) > 0.0:
+                    return False
+            return True
+        elif shape_type == ShapeType.CIRCLE:
+            return point.distance_squared(body.position) <= body.shape.radius ** 2
+
+        return False
+
+    @staticmethod
+    def overlaps_aabb(body, aabb):
+        # The body's own AABB settles the box axes, so polygons only have their edge normals left to test.
+        if not body.get_AABB().overlaps(aabb):
+            return False
+
+        shape_type = body.shape.type
+
+        if shape_type == ShapeType.BOX or shape_type == ShapeType.POLYGON:
+            corners = ((aabb.min.x, aabb.min.y), (aabb.max.x, aabb.min.y),
+                       (aabb.max.x, aabb.max.y), (aabb.min.x, aabb.max.y))
+            for v, n in zip(body.get_transformed_vertices(), body.get_transformed_normals()):
+                # A convex polygon reaches no further along an outward normal than that edge.
+                offset = n.x * v.x + n.y * v.y
+                if all(n.x * x + n.y * y > offset for x, y in corners):
+                    return False
+            return True
+        elif shape_type == ShapeType.CIRCLE:
+            center = body.position
+            dx = center.x - min(max(center.x, aabb.min.x), aabb.max.x)
+            dy = center.y - min(max(center.y, aabb.min.y), aabb.max.y)
+            return dx * dx + dy * dy <= body.shape.radius ** 2
+
+        return False
+
+    @staticmethod
+    def overlaps_circle(body, center, radius):
+        shape_type = body.shape.type
+
+        if shape_type == ShapeType.BOX or shape_type == ShapeType.POLYGON:
+            if Collisions.contains_point(body, center):
+                return True
+
+            vertices = body.get_transformed_vertices()
+            radius_sq = radius * radius
+            for i in range(len(vertices)):
+                distance_sq, _ = Collisions.point_segment_distance(center, vertices[i], vertices[(i + 1) % len(vertices)])
+                if distance_sq <= radius_sq:
+                    return True
+            return False
+        elif shape_type == ShapeType.CIRCLE:
+            return center.distance_squared(body.position) <= (radius + body.shape.radius) ** 2
+
+        return False
+
+    @staticmethod
+    def time_of_impact(body, start, start_angle, end, end_angle, other, target, max_iterations=20):
+        # First fraction of body's motion from (start, start_angle) to (end, end_angle) at which it comes within target of
+        # the fixed body other, as (hit, normal, point, fraction) with normal pointing from other towards body.
+        # Pairs overlapping at the start are left to the contact solver. Pairs already touching, within target and
+        # half again, only report a hit, at fraction 0, when the motion ends on the far side of other; any overlap on
+        # this side is the solver's.
+        shape = body.shape
+        miss = False, Vector2(), Vector2(), 0.0
+        tolerance = target * 0.5
+
+        if shape.type == ShapeType.CIRCLE:
+            gap, normal = Collisions.circle_gap(start, shape.radius, other)
+            if gap < 0.0:
+                return miss
+
+            if gap <= target + tolerance:
+                _, end_normal = Collisions.circle_gap(end, shape.radius, other)
+                if end_normal.dot(normal) > 0.0:
+                    return miss
+                return True, normal, start.copy().sub_scaled(normal, shape.radius), 0.0
+
+            radius = shape.radius + target
+            other_type = other.shape.type
+            if other_type == ShapeType.BOX or other_type == ShapeType.POLYGON:
+                hit, normal, fraction = Collisions.sweep_circle_polygon(
+                    start, end, radius, other.get_transformed_vertices(), other.get_transformed_normals())
+            else:
+                hit, normal, fraction = Collisions.raycast_circle(other.position, radius + other.shape.radius, start, end)
+
+            if not hit:
+                return miss
+            return True, normal, start.lerp(end, fraction).sub_scaled(normal, shape.radius), fraction
+
+        # Conservative advancement: no point of the body moves further than motion over the whole sweep, so stepping by
+        # the remaining gap over motion can never carry it past target.
+        motion = start.distance(end) + abs(end_angle - start_angle) * shape.bounding_radius
+        if motion == 0.0:
+            return miss
+
+        gap, normal, point = Collisions.polygon_gap_at(body, start, end, start_angle, end_angle, 0.0, other)
+        if gap < 0.0:
+            return miss
+
+        if gap <= target + tolerance:
+            _, end_normal, _ = Collisions.polygon_gap_at(body, start, end, start_angle, end_angle, 1.0, other)
+            if end_normal.dot(normal) > 0.0:
+                return miss
+            return True, normal, point, 0.0
+
+        fraction = 0.0
+        for _ in range(max_iterations):
+            fraction += (gap - target) / motion
+            if fraction >= 1.0:
+                return miss
+
+            gap, normal, point = Collisions.polygon_gap_at(body, start, end, start_angle, end_angle, fraction, other)
+            if gap <= target + tolerance:
+                break
+
+        return True, normal, point, fraction
+
+    @staticmethod
+    def circle_gap(center, radius, other):
+        # Distance between a circle's edge and the body other, negative when they overlap, with the normal from other.
+        other_type = other.shape.type
+
+        if other_type == ShapeType.CIRCLE:
+            dx = center.x - other.position.x
+            dy = center.y - other.position.y
+            distance = math.sqrt(dx * dx + dy * dy)
+            if distance == 0.0:
+                return -radius, Vector2()
+            return distance - radius - other.shape.radius, Vector2(dx / distance, dy / distance)
+
+        inside, distance_sq, closest = Collisions.polygon_distance(
+            center, other.get_transformed_vertices(), other.get_transformed_normals())
+        if inside or distance_sq == 0.0:
+            return -radius, Vector2()
+        distance = math.sqrt(distance_sq)
+        return distance - radius, Vector2((center.x - closest.x) / distance, (center.y - closest.y) / distance)
+
+    @staticmethod
+    def polygon_gap_at(body, start, end, start_angle, end_angle, fraction, other):
+        vertices, normals = Collisions.transform_polygon(
+            body.shape, start.lerp(end, fraction), start_angle + (end_angle - start_angle) * fraction)
+        return Collisions.polygon_gap(vertices, normals, other)
+
+    @staticmethod
+    def sweep_circle_polygon(start, end, radius, vertices, normals):
+        # A circle moving from start to end against a convex polygon is a ray against the polygon rounded by radius:
+        # its edges pushed out along their normals, joined by circles around the vertices.
+        _, distance_sq, _ = Collisions.polygon_distance(start, vertices, normals)
+        if distance_sq < radius * radius:
+            return False, Vector2(), 0.0
+
+        rx = end.x - start.x
+        ry = end.y - start.y
+        best_fraction = 2.0
+        best_normal = None
+
+        count = len(vertices)
+        for i in range(count):
+            n = normals[i]
+            denominator = n.x * rx + n.y * ry
+            if denominator >= 0.0:
+                continue
+
+            v = vertices[i]
+            fraction = (n.x * (start.x - v.x) + n.y * (start.y - v.y) - radius) / -denominator
+            if fraction < 0.0 or fraction > 1.0 or fraction >= best_fraction:
+                continue
+
+            # The edge only counts where the circle touches it between its vertices.
+            w = vertices[(i + 1) % count]
+            ex = w.x - v.x
+            ey = w.y - v.y
+            s = (start.x + rx * fraction - v.x) * ex + (start.y + ry * fraction - v.y) * ey
+            if 0.0 <= s <= ex * ex + ey * ey:
+                best_fraction = fraction
+                best_normal = n
+
+        for v in vertices:
+            hit, normal, fraction = Collisions.raycast_circle(v, radius, start, end)
+            if hit and fraction < best_fraction:
+                best_fraction = fraction
+                best_normal = normal
+
+        if best_normal is None:
+            return False, Vector2(), 0.0
+        return True, best_normal.copy(), best_fraction
+
+    @staticmethod
+    def polygon_distance(point, vertices, normals):
+        # Returns (inside, squared distance, closest point on the boundary) for a point and a convex polygon.
+        inside = True
+        for v, n in zip(vertices, normals):
+            if n.x * (point.x - v.x) + n.y * (point.y - v.y) > 0.0:
+                inside = False
+                break
+
+        min_distance_sq = float('inf')
+        closest = None
+        for i in range(len(vertices)):
+            distance_sq, cp = Collisions.point_segment_distance(point, vertices[i], vertices[(i + 1) % len(vertices)])
+            if distance_sq < min_distance_sq:
+                min_distance_sq = distance_sq
+                closest = cp
+
+        return inside, 0.0 if inside else min_distance_sq, closest
+
+    @staticmethod
+    def polygon_gap(vertices, normals, other):
+        # Lower bound on the distance between a polygon and the body other, as (gap, normal from other, witness point).
+        # Against a circle it is exact; against a polygon it is the widest separating axis, which never exceeds it.
+        other_type = other.shape.type
+
+        if other_type == ShapeType.CIRCLE:
+            center = other.position
+            inside, distance_sq, closest = Collisions.polygon_distance(center, vertices, normals)
+            if inside:
+                return -other.shape.radius, Vector2(), closest
+            distance = math.sqrt(distance_sq)
+            normal = Vector2((closest.x - center.x) / distance, (closest.y - center.y) / distance)
+            return distance - other.shape.radius, normal, closest
+
+        other_vertices = other.get_transformed_vertices()
+        other_normals = other.get_transformed_normals()
+        gap = float('-inf')
+        normal = None
+        point = None
+
+        # Faces of other against the polygon's deepest vertex, then faces of the polygon against other's deepest vertex;
+        # the polygon's normals point away from it, so they are flipped to point from other.
+        for face_vertices, face_normals, points, flip in ((other_vertices, other_normals, vertices, False),
+                                                          (vertices, normals, other_vertices, True)):
+            for v, n in zip(face_vertices, face_normals):
+                offset = n.x * v.x + n.y * v.y
+                separation = float('inf')
+                deepest = None
+                for p in points:
+                    projection = n.x * p.x + n.y * p.y - offset
+                    if projection < separation:
+                        separation = projection
+                        deepest = p
+
+                if separation > gap:
+                    gap = separation
+                    normal = -n if flip else n
+                    point = deepest
+
+        return gap, normal.copy(), point.copy()
+
+    @staticmethod
+    def transform_polygon(shape, position, angle):
+        # World-space vertices and edge normals of a polygon shape at a pose the body is not at.
+        cos = math.cos(angle)
+        sin = math.sin(angle)
+        vertices = [Vector2(cos * v.x - sin * v.y + position.x, sin * v.x + cos * v.y + position.y)
+                    for v in shape.vertices]
+        normals = [Vector2(cos * n.x - sin * n.y, sin * n.x + cos * n.y) for n in shape.normals]
+        return vertices, normals
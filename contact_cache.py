@@ -0,0 +1,73 @@
+from manifold import Manifold
+
+
+class ContactCache:
+    MATCH_DISTANCE = 2.0
+
+    def __init__(self):
+        self.previous = {}
+        self.current = {}
+
+    def __len__(self):
+        return len(self.current)
+
+    def begin(self):
+        # Pairs that are not found again before the next begin() are dropped.
+        self.previous = self.current
+        self.current = {}
+
+    def clear(self):
+        self.previous = {}
+        self.current = {}
+
+    def remove(self, body):
+        # Drops every pair the body takes part in, so a removed body is not kept alive or snapshotted.
+        self.previous = {key: entry for key, entry in self.previous.items() if body not in key}
+        self.current = {key: entry for key, entry in self.current.items() if body not in key}
+
+    def get(self, bodyA, bodyB) -> Manifold | None:
+        entry = self.current.get((bodyA, bodyB))
+        return None if entry is None else entry[0]
+
+    def update(self, manifold: Manifold):
+        # Contact points without ids are matched through their offset from bodyA, which survives translation.
+        key = (manifold.bodyA, manifold.bodyB)
+        origin = manifold.bodyA.position
+        points = [manifold.contact1, manifold.contact2]
+        anchors = [points[i] - origin for i in range(manifold.contact_count)]
+
+        entry = self.previous.get(key)
+        self.current[key] = (manifold, anchors)
+        if entry is None:
+            return
+
+        old, old_anchors = entry
+        if old.normal.dot(manifold.normal) <= 0:
+            return
+
+        if manifold.ids is not None and old.ids is not None:
+            # Clipped points carry feature ids, which match them exactly while the same faces stay in touch.
+            for i, contact_id in enumerate(manifold.ids):
+                if contact_id in old.ids:
+                    k = old.ids.index(contact_id)
+                    manifold.normal_impulses[i] = old.normal_impulses[k]
+                    manifold.tangent_impulses[i] = old.tangent_impulses[k]
+            return
+
+        max_distance_sq = self.MATCH_DISTANCE ** 2
+        used = [False] * len(old_anchors)
+        for i, anchor in enumerate(anchors):
+            best = -1
+            best_distance_sq = max_distance_sq
+            for k, old_anchor in enumerate(old_anchors):
+                if used[k]:
+                    continue
+                distance_sq = anchor.distance_squared(old_anchor)
+                if distance_sq < best_distance_sq:
+                    best = k
+                    best_distance_sq = distance_sq
+
+            if best >= 0:
+                used[best] = True
+                manifold.normal_impulses[i] = old.normal_impulses[best]
+                manifold.tangent_impulses[i] = old.tangent_impulses[best]
@@ -0,0 +1,248 @@
+from typing import List
+
+from manifold import Manifold
+from vector import Vector2
+
+
+class ContactConstraint:
+    def __init__(self, contact: Manifold):
+        self.contact = contact
+        self.bodyA = contact.bodyA
+        self.bodyB = contact.bodyB
+        self.normal = contact.normal
+        self.tangent = Vector2(contact.normal.y, -contact.normal.x)
+        self.point_count = contact.contact_count
+
+        self.restitution = min(self.bodyA.matter.restitution, self.bodyB.matter.restitution)
+        self.static_friction = (self.bodyA.matter.static_friction + self.bodyB.matter.static_friction) * 0.5
+        self.dynamic_friction = (self.bodyA.matter.dynamic_friction + self.bodyB.matter.dynamic_friction) * 0.5
+
+        self.ra_list = []
+        self.rb_list = []
+        self.normal_masses = []
+        self.tangent_masses = []
+        self.velocity_biases = []
+        self.block_mass = None
+
+        # Position iterations estimate the remaining penetration from how far the bodies moved since detection.
+        self.depth = contact.depth
+        self.positionA = self.bodyA.position.copy()
+        self.positionB = self.bodyB.position.copy()
+        self.angleA = self.bodyA.angle
+        self.angleB = self.bodyB.angle
+
+
+class ContactSolver:
+    RESTITUTION_THRESHOLD = 1.0
+    RESTITUTION_GRAVITY_STEPS = 2.0
+    LINEAR_SLOP = 0.5
+    BAUMGARTE = 0.2
+    MAX_LINEAR_CORRECTION = 5.0
+    MAX_CONDITION_NUMBER = 1000.0
+
+    def __init__(self, contacts: List[Manifold], warm_starting: bool = True,
+                 restitution_threshold: float = RESTITUTION_THRESHOLD):
+        self.constraints = [ContactConstraint(contact) for contact in contacts]
+        self.warm_starting = warm_starting
+        self.restitution_threshold = restitution_threshold
+
+    @staticmethod
+    def scaled_restitution_threshold(gravity: Vector2, dt: float) -> float:
+        # A resting body gains |gravity| * dt of approach speed every step, which must not count as an impact.
+        return max(ContactSolver.RESTITUTION_THRESHOLD, ContactSolver.RESTITUTION_GRAVITY_STEPS * gravity.length() * dt)
+
+    @staticmethod
+    def relative_velocity(bodyA, bodyB, ra: Vector2, rb: Vector2) -> Vector2:
+        velocityA = bodyA.linear_velocity
+        velocityB = bodyB.linear_velocity
+        angularA = bodyA.angular_velocity
+        angularB = bodyB.angular_velocity
+        return Vector2((velocityB.x + -rb.y * angularB) - (velocityA.x + -ra.y * angularA),
+                       (velocityB.y + rb.x * angularB) - (velocityA.y + ra.x * angularA))
+
+    @staticmethod
+    def apply_impulse(bodyA, bodyB, impulse: Vector2, ra: Vector2, rb: Vector2):
+        # The fused updates work in place and are assigned back for array-backed bodies.
+        bodyA.linear_velocity = bodyA.linear_velocity.sub_scaled(impulse, bodyA.inv_mass)
+        bodyA.angular_velocity -= ra.cross(impulse) * bodyA.inv_inertia
+        bodyB.linear_velocity = bodyB.linear_velocity.add_scaled(impulse, bodyB.inv_mass)
+        bodyB.angular_velocity += rb.cross(impulse) * bodyB.inv_inertia
+
+    @staticmethod
+    def effective_mass(bodyA, bodyB, ra: Vector2, rb: Vector2, direction: Vector2) -> float:
+        ra_cross = ra.cross(direction)
+        rb_cross = rb.cross(direction)
+        k = (bodyA.inv_mass + bodyB.inv_mass +
+             ra_cross * ra_cross * bodyA.inv_inertia +
+             rb_cross * rb_cross * bodyB.inv_inertia)
+        return 1.0 / k if k > 0 else 0.0
+
+    def initialize(self):
+        for constraint in self.constraints:
+            bodyA = constraint.bodyA
+            bodyB = constraint.bodyB
+            contact = constraint.contact
+            points = [contact.contact1, contact.contact2]
+
+            if not self.warm_starting:
+                contact.normal_impulses = [0.0, 0.0]
+                contact.tangent_impulses = [0.0, 0.0]
+
+            for i in range(constraint.point_count):
+                ra = points[i] - bodyA.position
+                rb = points[i] - bodyB.position
+                constraint.ra_list.append(ra)
+                constraint.rb_list.append(rb)
+                constraint.normal_masses.append(self.effective_mass(bodyA, bodyB, ra, rb, constraint.normal))
+                constraint.tangent_masses.append(self.effective_mass(bodyA, bodyB, ra, rb, constraint.tangent))
+
+                contact_velocity_mag = self.relative_velocity(bodyA, bodyB, ra, rb).dot(constraint.normal)
+                if contact_velocity_mag < -self.restitution_threshold:
+                    constraint.velocity_biases.append(-constraint.restitution * contact_velocity_mag)
+                else:
+                    constraint.velocity_biases.append(0.0)
+                    if contact_velocity_mag > self.restitution_threshold:
+                        # A point already moving apart, typically after a bounce, would get its warm-start impulse
+                        # taken back by the iterations, disturbing the other point and the friction on the way.
+                        contact.normal_impulses[i] = 0.0
+                        contact.tangent_impulses[i] = 0.0
+
+            if constraint.point_count == 2:
+                self.initialize_block(constraint)
+
+    def initialize_block(self, constraint: ContactConstraint):
+        # Two points on one face are solved together, otherwise the first point takes most of the load and tips the body.
+        bodyA = constraint.bodyA
+        bodyB = constraint.bodyB
+        normal = constraint.normal
+
+        rn1A = constraint.ra_list[0].cross(normal)
+        rn1B = constraint.rb_list[0].cross(normal)
+        rn2A = constraint.ra_list[1].cross(normal)
+        rn2B = constraint.rb_list[1].cross(normal)
+
+        inv_mass = bodyA.inv_mass + bodyB.inv_mass
+        k11 = inv_mass + bodyA.inv_inertia * rn1A * rn1A + bodyB.inv_inertia * rn1B * rn1B
+        k22 = inv_mass + bodyA.inv_inertia * rn2A * rn2A + bodyB.inv_inertia * rn2B * rn2B
+        k12 = inv_mass + bodyA.inv_inertia * rn1A * rn2A + bodyB.inv_inertia * rn1B * rn2B
+
+        determinant = k11 * k22 - k12 * k12
+        if k11 * k11 < self.MAX_CONDITION_NUMBER * determinant:
+            constraint.block_mass = (k11, k12, k22, determinant)
+
+    def warm_start(self):
+        if not self.warm_starting:
+            return
+
+        for constraint in self.constraints:
+            contact = constraint.contact
+            for i in range(constraint.point_count):
+                impulse = (constraint.normal * contact.normal_impulses[i] +
+                           constraint.tangent * contact.tangent_impulses[i])
+                self.apply_impulse(constraint.bodyA, constraint.bodyB, impulse,
+                                   constraint.ra_list[i], constraint.rb_list[i])
+
+    def solve_velocity_constraints(self):
+        for constraint in self.constraints:
+            bodyA = constraint.bodyA
+            bodyB = constraint.bodyB
+            contact = constraint.contact
+            normal = constraint.normal
+            tangent = constraint.tangent
+
+            for i in range(constraint.point_count):
+                ra = constraint.ra_list[i]
+                rb = constraint.rb_list[i]
+
+                jt = -self.relative_velocity(bodyA, bodyB, ra, rb).dot(tangent) * constraint.tangent_masses[i]
+                old_impulse = contact.tangent_impulses[i]
+                new_impulse = old_impulse + jt
+                max_friction = contact.normal_impulses[i] * constraint.static_friction
+                if abs(new_impulse) > max_friction:
+                    max_friction = contact.normal_impulses[i] * constraint.dynamic_friction
+                    new_impulse = max(-max_friction, min(new_impulse, max_friction))
+                contact.tangent_impulses[i] = new_impulse
+                self.apply_impulse(bodyA, bodyB, tangent * (new_impulse - old_impulse), ra, rb)
+
+            if constraint.block_mass is not None:
+                self.solve_block(constraint)
+                continue
+
+            for i in range(constraint.point_count):
+                ra = constraint.ra_list[i]
+                rb = constraint.rb_list[i]
+
+                contact_velocity_mag = self.relative_velocity(bodyA, bodyB, ra, rb).dot(normal)
+                j = (-contact_velocity_mag + constraint.velocity_biases[i]) * constraint.normal_masses[i]
+                old_impulse = contact.normal_impulses[i]
+                new_impulse = max(old_impulse + j, 0.0)
+                contact.normal_impulses[i] = new_impulse
+                self.apply_impulse(bodyA, bodyB, normal * (new_impulse - old_impulse), ra, rb)
+
+    def solve_block(self, constraint: ContactConstraint):
+        # Finds non-negative impulses x with complementary velocities vn = K * x + b by testing each active set.
+        bodyA = constraint.bodyA
+        bodyB = constraint.bodyB
+        contact = constraint.contact
+        normal = constraint.normal
+        ra1, ra2 = constraint.ra_list
+        rb1, rb2 = constraint.rb_list
+        k11, k12, k22, determinant = constraint.block_mass
+
+        a1, a2 = contact.normal_impulses[0], contact.normal_impulses[1]
+        vn1 = self.relative_velocity(bodyA, bodyB, ra1, rb1).dot(normal)
+        vn2 = self.relative_velocity(bodyA, bodyB, ra2, rb2).dot(normal)
+
+        b1 = vn1 - constraint.velocity_biases[0] - (k11 * a1 + k12 * a2)
+        b2 = vn2 - constraint.velocity_biases[1] - (k12 * a1 + k22 * a2)
+
+        x1 = -(k22 * b1 - k12 * b2) / determinant
+        x2 = -(k11 * b2 - k12 * b1) / determinant
+        if x1 < 0 or x2 < 0:
+            x1 = -b1 / k11
+            x2 = 0.0
+            if x1 < 0 or k12 * x1 + b2 < 0:
+                x1 = 0.0
+                x2 = -b2 / k22
+                if x2 < 0 or k12 * x2 + b1 < 0:
+                    x1 = 0.0
+                    x2 = 0.0
+                    if b1 < 0 or b2 < 0:
+                        return
+
+        self.apply_impulse(bodyA, bodyB, normal * (x1 - a1), ra1, rb1)
+        self.apply_impulse(bodyA, bodyB, normal * (x2 - a2), ra2, rb2)
+        contact.normal_impulses[0] = x1
+        contact.normal_impulses[1] = x2
+
+    def solve_position_constraints(self, constraints: List[ContactConstraint] = None) -> bool:
+        min_separation = 0.0
+
+        for constraint in self.constraints if constraints is None else constraints:
+            bodyA = constraint.bodyA
+            bodyB = constraint.bodyB
+            normal = constraint.normal
+
+            for i in range(constraint.point_count):
+                ra = constraint.ra_list[i]
+                rb = constraint.rb_list[i]
+
+                displacementA = (bodyA.position - constraint.positionA +
+                                 ra.cross_scalar(bodyA.angle - constraint.angleA))
+                displacementB = (bodyB.position - constraint.positionB +
+                                 rb.cross_scalar(bodyB.angle - constraint.angleB))
+                separation = (displacementB - displacementA).dot(normal) - constraint.depth
+                min_separation = min(min_separation, separation)
+
+                correction = max(-self.MAX_LINEAR_CORRECTION,
+                                 min(self.BAUMGARTE * (separation + self.LINEAR_SLOP), 0.0))
+                impulse = normal * (-correction * constraint.normal_masses[i])
+
+                if not bodyA.is_static:
+                    bodyA.move(-impulse * bodyA.inv_mass)
+                    bodyA.rotate(-ra.cross(impulse) * bodyA.inv_inertia)
+                if not bodyB.is_static:
+                    bodyB.move(impulse * bodyB.inv_mass)
+                    bodyB.rotate(rb.cross(impulse) * bodyB.inv_inertia)
+
+        return min_separation >= -3.0 * self.LINEAR_SLOP
@@ -0,0 +1,255 @@
+from AABB import AABB
+
+
+class TreeNode:
+    def __init__(self, aabb: AABB, data=None):
+        self.aabb = aabb
+        self.data = data
+        self.parent = None
+        self.child1 = None
+        self.child2 = None
+        self.height = 0
+
+
+class DynamicTree:
+    def __init__(self, margin: float = 2.0):
+        if margin < 0:
+            raise ValueError("Margin must be a positive value.")
+        self.margin = margin
+        self.root = None
+        self.leaf_count = 0
+
+    def insert(self, aabb: AABB, data) -> TreeNode:
+        leaf = TreeNode(aabb.expanded(self.margin), data)
+        self.insert_leaf(leaf)
+        self.leaf_count += 1
+        return leaf
+
+    def remove(self, leaf: TreeNode):
+        self.remove_leaf(leaf)
+        self.leaf_count -= 1
+
+    def move(self, leaf: TreeNode, aabb: AABB) -> bool:
+        if leaf.aabb.contains(aabb):
+            return False
+
+        self.remove_leaf(leaf)
+        leaf.aabb = aabb.expanded(self.margin)
+        self.insert_leaf(leaf)
+        return True
+
+    def query(self, aabb: AABB):
+        if self.root is None:
+            return
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if not node.aabb.overlaps(aabb):
+                continue
+
+            if node.child1 is None:
+                yield node.data
+            else:
+                stack.append(node.child1)
+                stack.append(node.child2)
+
+    def query_point(self, x, y):
+        if self.root is None:
+            return
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if not node.aabb.contains_point(x, y):
+                continue
+
+            if node.child1 is None:
+                yield node.data
+            else:
+                stack.append(node.child1)
+                stack.append(node.child2)
+
+    def raycast(self, p1, p2, callback, max_fraction: float = 1.0):
+        # callback(data, p1, p2, max_fraction) returns 0 to stop, a fraction to clip the ray, or a negative to skip.
+        if self.root is None:
+            return
+
+        dx = p2.x - p1.x
+        dy = p2.y - p1.y
+        inv_dx = 1.0 / dx if dx != 0 else float('inf')
+        inv_dy = 1.0 / dy if dy != 0 else float('inf')
+
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if not self.ray_overlaps(node.aabb, p1.x, p1.y, dx, dy, inv_dx, inv_dy, max_fraction):
+                continue
+
+            if node.child1 is None:
+                value = callback(node.data, p1, p2, max_fraction)
+                if value == 0.0:
+                    return
+                if 0.0 < value < max_fraction:
+                    max_fraction = value
+            else:
+                stack.append(node.child1)
+                stack.append(node.child2)
+
+    @staticmethod
+    def ray_overlaps(aabb, ox, oy, dx, dy, inv_dx, inv_dy, max_fraction):
+        t_min = 0.0
+        t_max = max_fraction
+
+        if dx == 0:
+            if ox < aabb.min.x or ox > aabb.max.x:
+                return False
+        else:
+            t1 = (aabb.min.x - ox) * inv_dx
+            t2 = (aabb.max.x - ox) * inv_dx
+            if t1 > t2:
+                t1, t2 = t2, t1
+            t_min = max(t_min, t1)
+            t_max = min(t_max, t2)
+            if t_min > t_max:
+                return False
+
+        if dy == 0:
+            if oy < aabb.min.y or oy > aabb.max.y:
+                return False
+        else:
+            t1 = (aabb.min.y - oy) * inv_dy
+            t2 = (aabb.max.y - oy) * inv_dy
+            if t1 > t2:
+                t1, t2 = t2, t1
+            t_min = max(t_min, t1)
+            t_max = min(t_max, t2)
+            if t_min > t_max:
+                return False
+
+        return True
+
+    def insert_leaf(self, leaf: TreeNode):
+        if self.root is None:
+            self.root = leaf
+            leaf.parent = None
+            return
+
+        leaf_aabb = leaf.aabb
+        node = self.root
+        while node.child1 is not None:
+            area = node.aabb.perimeter()
+            combined_area = node.aabb.union(leaf_aabb).perimeter()
+
+            cost = 2.0 * combined_area
+            inheritance_cost = 2.0 * (combined_area - area)
+
+            cost1 = self.descend_cost(node.child1, leaf_aabb) + inheritance_cost
+            cost2 = self.descend_cost(node.child2, leaf_aabb) + inheritance_cost
+
+            if cost < cost1 and cost < cost2:
+                break
+
+            node = node.child1 if cost1 < cost2 else node.child2
+
+        sibling = node
+        old_parent = sibling.parent
+        new_parent = TreeNode(sibling.aabb.union(leaf_aabb))
+        new_parent.parent = old_parent
+        new_parent.height = sibling.height + 1
+        new_parent.child1 = sibling
+        new_parent.child2 = leaf
+        sibling.parent = new_parent
+        leaf.parent = new_parent
+
+        if old_parent is None:
+            self.root = new_parent
+        elif old_parent.child1 is sibling:
+            old_parent.child1 = new_parent
+        else:
+            old_parent.child2 = new_parent
+
+        self.refit(leaf.parent)
+
+    @staticmethod
+    def descend_cost(child: TreeNode, leaf_aabb: AABB) -> float:
+        combined_area = child.aabb.union(leaf_aabb).perimeter()
+        if child.child1 is None:
+            return combined_area
+        return combined_area - child.aabb.perimeter()
+
+    def remove_leaf(self, leaf: TreeNode):
+        if leaf is self.root:
+            self.root = None
+            return
+
+        parent = leaf.parent
+        grand_parent = parent.parent
+        sibling = parent.child2 if parent.child1 is leaf else parent.child1
+
+        if grand_parent is None:
+            self.root = sibling
+            sibling.parent = None
+        else:
+            if grand_parent.child1 is parent:
+                grand_parent.child1 = sibling
+            else:
+                grand_parent.child2 = sibling
+            sibling.parent = grand_parent
+            self.refit(grand_parent)
+
+        leaf.parent = None
+
+    def refit(self, node: TreeNode):
+        while node is not None:
+            node = self.balance(node)
+
+            child1 = node.child1
+            child2 = node.child2
+            node.height = 1 + max(child1.height, child2.height)
+            node.aabb = child1.aabb.union(child2.aabb)
+
+            node = node.parent
+
+    def balance(self, a: TreeNode) -> TreeNode:
+        if a.child1 is None or a.height < 2:
+            return a
+
+        b = a.child1
+        c = a.child2
+        balance = c.height - b.height
+
+        if balance > 1:
+            return self.rotate(a, c, b)
+        if balance < -1:
+            return self.rotate(a, b, c)
+        return a
+
+    def rotate(self, a: TreeNode, up: TreeNode, other: TreeNode) -> TreeNode:
+        # Lifts the taller child into a's place and hangs its shorter grandchild under a.
+        f = up.child1
+        g = up.child2
+
+        up.parent = a.parent
+        if up.parent is None:
+            self.root = up
+        elif up.parent.child1 is a:
+            up.parent.child1 = up
+        else:
+            up.parent.child2 = up
+
+        keep, lower = (f, g) if f.height > g.height else (g, f)
+
+        up.child1 = a
+        up.child2 = keep
+        a.parent = up
+
+        a.child1 = other
+        a.child2 = lower
+        lower.parent = a
+
+        a.aabb = other.aabb.union(lower.aabb)
+        a.height = 1 + max(other.height, lower.height)
+        up.aabb = a.aabb.union(keep.aabb)
+        up.height = 1 + max(a.height, keep.height)
+        return up
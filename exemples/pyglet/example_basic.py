@@ -67,7 +67,7 @@ window = Window(800, 600, "Matter.py Physics Engine")
 
 # Update function to advance the simulation
 def update(dt):
-    world.step(dt, iterations=8)  # Step the simulation with fixed time step
+    world.advance(dt, 1/60, iterations=8)  # Step the simulation in fixed 1/60 s steps through the elapsed time
 
 # Schedule the update function to be called at 60 FPS
 schedule_interval(update, 1/60)
@@ -79,10 +79,12 @@ def on_draw():
 
     for body in world.bodies:
         if body.shape.type == ShapeType.CIRCLE:
-            shapes.Circle(body.position.x, body.position.y, body.shape.radius, color=body.matter.color).draw()
+            position = world.interpolated_position(body)  # Blended between the last two steps for smooth motion
+            shapes.Circle(position.x, position.y, body.shape.radius, color=body.matter.color).draw()
 
         elif body.shape.type == ShapeType.BOX:
-            shapes.Polygon(*body.get_vertices(tuple=True), color=body.matter.color).draw()
+            vertices = [(v.x, v.y) for v in world.interpolated_vertices(body)]
+            shapes.Polygon(*vertices, color=body.matter.color).draw()
 
 # Event handler for mouse clicks to create new bodies
 @window.event
@@ -73,7 +73,7 @@ camera.set_center(window.width / 2, window.height / 2)
 
 # update world
 def update(dt):
-    world.step(dt, iterations=8)
+    world.advance(dt, 1/60, iterations=8)
 
 schedule_interval(update, 1/60)
 
@@ -85,12 +85,13 @@ def on_draw():
     for body in world.bodies:
 
         if body.shape.type == ShapeType.CIRCLE:
-            nx, ny = camera.world_to_screen(body.position.x, body.position.y)
+            position = world.interpolated_position(body)
+            nx, ny = camera.world_to_screen(position.x, position.y)
             shapes.Circle(nx, ny, body.shape.radius * camera.zoom, color=body.matter.color).draw()
 
         elif body.shape.type == ShapeType.BOX:
-            vertices = body.get_vertices(tuple=True)
-            vertices_on_screen = [camera.world_to_screen(v[0], v[1]) for v in vertices]
+            vertices = world.interpolated_vertices(body)
+            vertices_on_screen = [camera.world_to_screen(v.x, v.y) for v in vertices]
             shapes.Polygon(*vertices_on_screen, color=body.matter.color).draw()
 
 @window.event
@@ -23,7 +23,7 @@ POCKET_RADIUS = 24
 
 class Game:
     def __init__(self) -> None:
-        self.world = World(gravity=Vector2(0, 0), damping=0.1)
+        self.world = World(gravity=Vector2(0, 0), damping=0.1, allow_sleeping=True)
 
         self.background_image = image.load('../assets/images/pool_table.png')
         self.background_texture = self.background_image.get_texture()
@@ -89,7 +89,7 @@ class Game:
             self.world.add_body(ball)
 
         self.cue_ball = Body(Circle(BALL_RADIUS), Matter(density=1, friction=0.6, color=(240, 240, 240)),
-                             cue_ball_position.x, cue_ball_position.y)
+                             cue_ball_position.x, cue_ball_position.y, is_bullet=True)
         self.world.add_body(self.cue_ball)
 
     def triangle_positions(self, center: Vector2, radius: float, num_balls: int) -> List[Vector2]:
@@ -133,7 +133,7 @@ class Game:
 
     def update(self, dt: float) -> None:
         """Updates the game state."""
-        self.world.step(dt, iterations=8)
+        self.world.advance(dt, 1 / 60, iterations=8)
         # Check for balls in pockets
         balls_to_remove = []
         for body in self.world.bodies:
@@ -153,7 +153,7 @@ class Game:
         self.world.remove_body(self.cue_ball)
         cue_ball_position = Vector2(self.center_x, self.center_y - 200)
         self.cue_ball = Body(Circle(BALL_RADIUS), Matter(density=1, friction=0.6, color=(240, 240, 240)),
-                             cue_ball_position.x, cue_ball_position.y)
+                             cue_ball_position.x, cue_ball_position.y, is_bullet=True)
         self.world.add_body(self.cue_ball)
 
     def on_draw(self) -> None:
@@ -164,7 +164,8 @@ class Game:
         # Draw balls
         for body in self.world.bodies:
             if body.shape.type == ShapeType.CIRCLE:
-                shapes.Circle(body.position.x, body.position.y, body.shape.radius, color=body.matter.color).draw()
+                position = self.world.interpolated_position(body)
+                shapes.Circle(position.x, position.y, body.shape.radius, color=body.matter.color).draw()
 
         # Draw cue
         if self.cue.start_pos:
@@ -179,6 +180,11 @@ class Game:
             # Compute the end position of the preview line
             preview_end_pos = ball_pos + normalized_direction * -direction_length * 4
 
+            # Stop the preview line at the first ball or wall in its way
+            hit = self.world.raycast(ball_pos, preview_end_pos, lambda body: body is not self.cue_ball)
+            if hit is not None:
+                preview_end_pos = hit.point
+
             # Draw the cue line
             shapes.Line(ball_pos.x, ball_pos.y, cursor_pos.x, cursor_pos.y, width=4, color=(64, 64, 64)).draw()
 
@@ -0,0 +1,51 @@
+from typing import List
+
+from manifold import Manifold
+
+
+class Island:
+    def __init__(self):
+        self.bodies = []
+        self.contacts: List[Manifold] = []
+
+    @staticmethod
+    def build(bodies, contacts: List[Manifold]) -> List['Island']:
+        # Union-find over the awake dynamic bodies; static bodies never join two islands together.
+        indices = {}
+        for body in bodies:
+            if not body.is_static and body.is_awake:
+                indices[body] = len(indices)
+        parents = list(range(len(indices)))
+
+        def find(i):
+            while parents[i] != i:
+                parents[i] = parents[parents[i]]
+                i = parents[i]
+            return i
+
+        for contact in contacts:
+            a = indices.get(contact.bodyA)
+            b = indices.get(contact.bodyB)
+            if a is None or b is None:
+                continue
+            root_a = find(a)
+            root_b = find(b)
+            if root_a != root_b:
+                parents[max(root_a, root_b)] = min(root_a, root_b)
+
+        islands = {}
+        for body, i in indices.items():
+            root = find(i)
+            island = islands.get(root)
+            if island is None:
+                island = islands[root] = Island()
+            island.bodies.append(body)
+
+        for contact in contacts:
+            index = indices.get(contact.bodyA)
+            if index is None:
+                index = indices.get(contact.bodyB)
+            if index is not None:
+                islands[find(index)].contacts.append(contact)
+
+        return list(islands.values())
@@ -0,0 +1,92 @@
+from contact_solver import ContactSolver
+from island import Island
+from manifold import Manifold
+
+
+class IslandBody:
+    # A detached copy of the state the contact solver touches, so an island can be pickled to a worker process.
+    __slots__ = ('position', 'linear_velocity', 'angle', 'angular_velocity',
+                 'inv_mass', 'inv_inertia', 'is_static', 'matter')
+
+    def __init__(self, body):
+        self.position = body.position.copy()
+        self.linear_velocity = body.linear_velocity.copy()
+        self.angle = body.angle
+        self.angular_velocity = body.angular_velocity
+        self.inv_mass = body.inv_mass
+        self.inv_inertia = body.inv_inertia
+        self.is_static = body.is_static
+        self.matter = body.matter
+
+    def move(self, amount):
+        self.position += amount
+
+    def rotate(self, amount):
+        self.angle += amount
+
+    def integrate_position(self, dt):
+        if self.is_static:
+            return
+
+        self.position.add_scaled(self.linear_velocity, dt)
+
+        self.angle += self.angular_velocity * dt
+
+
+class IslandSolver:
+    @staticmethod
+    def pack(island: Island):
+        proxies = {body: IslandBody(body) for body in island.bodies}
+
+        contacts = []
+        for contact in island.contacts:
+            bodyA = proxies.get(contact.bodyA)
+            if bodyA is None:
+                bodyA = IslandBody(contact.bodyA)
+            bodyB = proxies.get(contact.bodyB)
+            if bodyB is None:
+                bodyB = IslandBody(contact.bodyB)
+
+            copy = Manifold(bodyA, bodyB, contact.normal, contact.depth,
+                            contact.contact1, contact.contact2, contact.contact_count, contact.ids)
+            copy.normal_impulses = list(contact.normal_impulses)
+            copy.tangent_impulses = list(contact.tangent_impulses)
+            contacts.append(copy)
+
+        return [proxies[body] for body in island.bodies], contacts
+
+    @staticmethod
+    def solve(bodies, contacts, dt: float, warm_starting: bool, restitution_threshold: float,
+              velocity_iterations: int, position_iterations: int):
+        # Works on real bodies when called inline and on IslandBody copies in a worker, with the same arithmetic.
+        solver = ContactSolver(contacts, warm_starting, restitution_threshold)
+        solver.initialize()
+        solver.warm_start()
+        for _ in range(velocity_iterations):
+            solver.solve_velocity_constraints()
+
+        for body in bodies:
+            body.integrate_position(dt)
+
+        for _ in range(position_iterations):
+            if solver.solve_position_constraints():
+                break
+
+        states = [(body.position, body.linear_velocity, body.angle, body.angular_velocity) for body in bodies]
+        impulses = [(contact.normal_impulses, contact.tangent_impulses) for contact in contacts]
+        return states, impulses
+
+    @staticmethod
+    def unpack(island: Island, result):
+        states, impulses = result
+        for body, (position, linear_velocity, angle, angular_velocity) in zip(island.bodies, states):
+            body.position = position
+            body.linear_velocity = linear_velocity
+            body.angle = angle
+            body.angular_velocity = angular_velocity
+            body.transform_update_required = True
+            body.aabb_update_required = True
+
+        for contact, (normal_impulses, tangent_impulses) in zip(island.contacts, impulses):
+            contact.normal_impulses = normal_impulses
+            contact.tangent_impulses = tangent_impulses
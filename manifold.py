@@ -1,9 +1,14 @@
 class Manifold:
-    def __init__(self, bodyA, bodyB, normal, depth, contact1, contact2, contact_count):
+    def __init__(self, bodyA, bodyB, normal, depth, contact1, contact2, contact_count, ids=None):
         self.bodyA = bodyA
         self.bodyB = bodyB
         self.normal = normal
         self.depth = depth
         self.contact1 = contact1
         self.contact2 = contact2
-        self.contact_count = contact_count
\ No newline at end of file
+        self.contact_count = contact_count
+        # Feature ids of the points, stable while the same faces touch; None where points are matched by distance.
+        self.ids = ids
+
+        self.normal_impulses = [0.0, 0.0]
+        self.tangent_impulses = [0.0, 0.0]
@@ -0,0 +1,9 @@
+from vector import Vector2
+
+
+class RaycastHit:
+    def __init__(self, body, point: Vector2, normal: Vector2, fraction: float):
+        self.body = body
+        self.point = point
+        self.normal = normal
+        self.fraction = fraction
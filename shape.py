@@ -13,12 +13,49 @@ class Shape:
     def __init__(self, shape_type: ShapeType):
         self.area = None
         self.vertices = None
+        self.normals = None
+        self.edge_lengths = None
+        self.bounding_radius = 0.0
         self.type = shape_type
 
+    def calculate_edges(self):
+        # Local-space outward unit normals and lengths of the edges, fixed for the lifetime of the shape.
+        normals = []
+        lengths = []
+        count = len(self.vertices)
+        # (-edge.y, edge.x) points outwards on clockwise outlines and is flipped on counter-clockwise ones.
+        winding = -1.0 if self.signed_area() > 0 else 1.0
+        for i in range(count):
+            va = self.vertices[i]
+            vb = self.vertices[(i + 1) % count]
+            axis_x = (va.y - vb.y) * winding
+            axis_y = (vb.x - va.x) * winding
+            length = math.sqrt(axis_x ** 2 + axis_y ** 2)
+            if length == 0:
+                normals.append(Vector2(0, 0))
+            else:
+                inv_length = 1.0 / length
+                normals.append(Vector2(axis_x * inv_length, axis_y * inv_length))
+            lengths.append(length)
+
+        self.normals = normals
+        self.edge_lengths = lengths
+        self.bounding_radius = max(math.sqrt(v.x ** 2 + v.y ** 2) for v in self.vertices)
+
+    def signed_area(self):
+        area = 0.0
+        count = len(self.vertices)
+        for i in range(count):
+            va = self.vertices[i]
+            vb = self.vertices[(i + 1) % count]
+            area += va.x * vb.y - vb.x * va.y
+        return area * 0.5
+
 class Circle(Shape):
     def __init__(self, radius):
         super().__init__(ShapeType.CIRCLE)
         self.radius = radius
+        self.bounding_radius = radius
         self.area = self.calculate_area()
 
     def calculate_area(self):
@@ -30,6 +67,7 @@ class Box(Shape):
         self.width = width*2
         self.height = height
         self.vertices = self.calculate_vertices(width, height)
+        self.calculate_edges()
         self.area = self.calculate_area()
 
     def calculate_vertices(self, width, height):
@@ -54,6 +92,7 @@ class Polygon(Shape):
         self.radius = radius
         self.num_points = num_points
         self.vertices = self.calculate_vertices()
+        self.calculate_edges()
         self.area = self.calculate_area()
 
     def calculate_vertices(self):
@@ -0,0 +1,23 @@
+from typing import List
+
+from vector import Vector2
+
+
+class SimulationResult:
+    TIME = 'time'
+    REST = 'rest'
+    PREDICATE = 'predicate'
+
+    def __init__(self, reason: str, steps: int, time: float, positions: List[Vector2], angles: List[float],
+                 triggered_bodies: List, trajectories: List[List[Vector2]]):
+        self.reason = reason
+        self.steps = steps
+        self.time = time
+        self.positions = positions
+        self.angles = angles
+        self.triggered_bodies = triggered_bodies
+        self.trajectories = trajectories
+
+    @property
+    def at_rest(self) -> bool:
+        return self.reason == self.REST
@@ -0,0 +1,129 @@
+import struct
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from manifold import Manifold
+from vector import Vector2
+
+
+class WorldSnapshot:
+    # Layout: header, then per body 9 doubles (position, velocity, angle, angular velocity, force, sleep time),
+    # then one flag byte per body, then per cached contact 20 doubles. Cached vertices and AABBs are not captured,
+    # so restoring always rebuilds them from the restored pose.
+    HEADER = struct.Struct('<II')
+    BODY_FLOATS = 9
+    CONTACT_FLOATS = 20
+    NO_ID = -1.0
+
+    AWAKE = 1
+
+    @staticmethod
+    def capture(world) -> bytes:
+        bodies = world.bodies
+        entries = list(world.contact_cache.current.values())
+
+        if world.body_store is not None:
+            store = world.body_store
+            rows = np.array([body.store_index for body in bodies], dtype=np.intp)
+            floats = np.empty((len(bodies), WorldSnapshot.BODY_FLOATS), dtype=np.float64)
+            floats[:, 0:2] = store.position[rows]
+            floats[:, 2:4] = store.linear_velocity[rows]
+            floats[:, 4] = store.angle[rows]
+            floats[:, 5] = store.angular_velocity[rows]
+            floats[:, 6:8] = store.force[rows]
+            floats[:, 8] = store.sleep_time[rows]
+            flags = (store.is_awake[rows] * WorldSnapshot.AWAKE).astype(np.uint8)
+            body_block = floats.tobytes() + flags.tobytes()
+        else:
+            floats = array('d')
+            flags = bytearray(len(bodies))
+            for i, body in enumerate(bodies):
+                position = body.position
+                velocity = body.linear_velocity
+                force = body.force
+                floats.extend((position.x, position.y, velocity.x, velocity.y, body.angle, body.angular_velocity,
+                               force.x, force.y, body.sleep_time))
+                flags[i] = WorldSnapshot.AWAKE if body.is_awake else 0
+            body_block = floats.tobytes() + bytes(flags)
+
+        indices = {body: i for i, body in enumerate(bodies)}
+        contacts = array('d')
+        for manifold, anchors in entries:
+            anchors = list(anchors) + [Vector2()] * (2 - len(anchors))
+            # Feature ids are small integers, exact as doubles.
+            ids = [WorldSnapshot.NO_ID] * 2 if manifold.ids is None else list(manifold.ids) + [WorldSnapshot.NO_ID]
+            contacts.extend((indices[manifold.bodyA], indices[manifold.bodyB],
+                             manifold.normal.x, manifold.normal.y, manifold.depth,
+                             manifold.contact1.x, manifold.contact1.y, manifold.contact2.x, manifold.contact2.y,
+                             manifold.contact_count,
+                             manifold.normal_impulses[0], manifold.normal_impulses[1],
+                             manifold.tangent_impulses[0], manifold.tangent_impulses[1],
+                             anchors[0].x, anchors[0].y, anchors[1].x, anchors[1].y, ids[0], ids[1]))
+
+        return WorldSnapshot.HEADER.pack(len(bodies), len(entries)) + body_block + contacts.tobytes()
+
+    @staticmethod
+    def restore(world, buffer: bytes):
+        bodies = world.bodies
+        body_count, contact_count = WorldSnapshot.HEADER.unpack_from(buffer, 0)
+        if body_count != len(bodies):
+            raise ValueError("Snapshot does not match the bodies of this world.")
+
+        offset = WorldSnapshot.HEADER.size
+        float_count = body_count * WorldSnapshot.BODY_FLOATS
+        floats = array('d')
+        floats.frombytes(buffer[offset:offset + float_count * 8])
+        offset += float_count * 8
+        flags = buffer[offset:offset + body_count]
+        offset += body_count
+
+        if world.body_store is not None:
+            store = world.body_store
+            rows = np.array([body.store_index for body in bodies], dtype=np.intp)
+            values = np.frombuffer(floats, dtype=np.float64).reshape(body_count, WorldSnapshot.BODY_FLOATS)
+            masks = np.frombuffer(flags, dtype=np.uint8)
+            store.position[rows] = values[:, 0:2]
+            store.linear_velocity[rows] = values[:, 2:4]
+            store.angle[rows] = values[:, 4]
+            store.angular_velocity[rows] = values[:, 5]
+            store.force[rows] = values[:, 6:8]
+            store.sleep_time[rows] = values[:, 8]
+            store.is_awake[rows] = (masks & WorldSnapshot.AWAKE) != 0
+            store.transform_update_required[rows] = True
+            store.aabb_update_required[rows] = True
+        else:
+            for i, body in enumerate(bodies):
+                k = i * WorldSnapshot.BODY_FLOATS
+                body.position = Vector2(floats[k], floats[k + 1])
+                body.linear_velocity = Vector2(floats[k + 2], floats[k + 3])
+                body.angle = floats[k + 4]
+                body.angular_velocity = floats[k + 5]
+                body.force = Vector2(floats[k + 6], floats[k + 7])
+                body.sleep_time = floats[k + 8]
+                body.is_awake = bool(flags[i] & WorldSnapshot.AWAKE)
+                body.transform_update_required = True
+                body.aabb_update_required = True
+
+        contacts = array('d')
+        contacts.frombytes(buffer[offset:offset + contact_count * WorldSnapshot.CONTACT_FLOATS * 8])
+
+        cache = world.contact_cache
+        cache.clear()
+        world.contacts.clear()
+        world.contact_pairs.clear()
+        for k in range(0, len(contacts), WorldSnapshot.CONTACT_FLOATS):
+            (a, b, nx, ny, depth, c1x, c1y, c2x, c2y, count,
+             n0, n1, t0, t1, a0x, a0y, a1x, a1y, id0, id1) = contacts[k:k + WorldSnapshot.CONTACT_FLOATS]
+            count = int(count)
+            ids = None if id0 == WorldSnapshot.NO_ID else [int(id0), int(id1)][:count]
+            manifold = Manifold(bodies[int(a)], bodies[int(b)], Vector2(nx, ny), depth,
+                                Vector2(c1x, c1y), Vector2(c2x, c2y), count, ids)
+            manifold.normal_impulses = [n0, n1]
+            manifold.tangent_impulses = [t0, t1]
+            anchors = [Vector2(a0x, a0y), Vector2(a1x, a1y)][:count]
+            cache.current[(manifold.bodyA, manifold.bodyB)] = (manifold, anchors)
+            world.contacts.append(manifold)
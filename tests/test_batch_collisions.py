@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from body import Body
+from collisions import Collisions
+from matter import Matter
+from shape import Box, Circle, Polygon
+from vector import Vector2
+from world import World
+
+pytest.importorskip('numpy')
+from batch_collisions import BatchCollisions  # noqa: E402
+
+
+def make_bodies(count, seed, shapes):
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(count):
+        shape = rng.choice(shapes)
+        if shape is Box:
+            shape = Box(rng.uniform(5, 60), rng.uniform(5, 60))
+        elif shape is Polygon:
+            shape = Polygon(rng.uniform(5, 30), rng.randint(3, 8))
+        else:
+            shape = Circle(rng.uniform(5, 30))
+        body = Body(shape, Matter(density=1), rng.uniform(0, 200), rng.uniform(0, 200))
+        body.angle = rng.uniform(0, 6.28)
+        bodies.append(body)
+    return bodies
+
+
+def assert_matches_scalar(bodies):
+    pairs = [(i, j) for i in range(len(bodies)) for j in range(i + 1, len(bodies))]
+    results = BatchCollisions.collide_pairs(bodies, pairs)
+
+    hits = 0
+    for (i, j), (collision, normal, depth, contacts) in zip(pairs, results):
+        expected, expected_normal, expected_depth = Collisions.collide(bodies[i], bodies[j])
+        assert collision == expected
+        if not collision:
+            continue
+
+        hits += 1
+        assert normal.x == pytest.approx(expected_normal.x, abs=1e-9)
+        assert normal.y == pytest.approx(expected_normal.y, abs=1e-9)
+        assert depth == pytest.approx(expected_depth, abs=1e-9)
+        if contacts is not None:
+            expected_contacts = Collisions.find_contact_points(bodies[i], bodies[j])
+            assert contacts[2] == expected_contacts[2]
+            assert contacts[0].x == pytest.approx(expected_contacts[0].x, abs=1e-9)
+            assert contacts[0].y == pytest.approx(expected_contacts[0].y, abs=1e-9)
+    assert hits > 0
+
+
+def test_batched_sat_matches_scalar_path():
+    assert_matches_scalar(make_bodies(40, seed=3, shapes=[Box, Polygon]))
+
+
+def test_bucketed_narrow_phase_matches_scalar_path():
+    assert_matches_scalar(make_bodies(60, seed=4, shapes=[Box, Polygon, Circle]))
+    assert_matches_scalar(make_bodies(40, seed=5, shapes=[Circle]))
+
+
+def test_batched_world_steps_like_the_scalar_world():
+    for kwargs in (dict(), dict(sequential_impulses=True, warm_starting=True)):
+        worlds = []
+        for batch_narrow_phase in (False, True):
+            world = World(gravity=Vector2(0, -98.1), batch_narrow_phase=batch_narrow_phase, **kwargs)
+            world.add_body(Body(Box(400, 20), Matter(density=0), 100, -10, is_static=True))
+            world.add_body(make_bodies(30, seed=6, shapes=[Box, Polygon, Circle]))
+            worlds.append(world)
+
+        for _ in range(60):
+            for world in worlds:
+                world.step(1 / 60, 4)
+
+        scalar, batched = ([(body.position.x, body.position.y, body.angle) for body in world.bodies] for world in worlds)
+        assert batched == scalar
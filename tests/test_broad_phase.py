@@ -0,0 +1,66 @@
+import random
+
+from AABB import AABBArray
+from body import Body
+from broad_phase import BruteForceBroadPhase, DynamicTreeBroadPhase, SpatialHashGrid, SweepAndPrune
+from matter import Matter
+from shape import Box, Circle
+from vector import Vector2
+
+
+def make_scene(count, seed):
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(count):
+        x, y = rng.uniform(0, 600), rng.uniform(0, 600)
+        if rng.random() < 0.5:
+            body = Body(Circle(rng.uniform(5, 40)), Matter(density=1), x, y)
+        else:
+            body = Body(Box(rng.uniform(5, 80), rng.uniform(5, 80)), Matter(density=1), x, y)
+        body.angle = rng.uniform(0, 6.28)
+        body.is_awake = rng.random() < 0.8
+        bodies.append(body)
+    return rng, bodies
+
+
+def bounds_of(bodies):
+    bounds = AABBArray(len(bodies))
+    for index, body in enumerate(bodies):
+        body.transform_update_required = True
+        body.aabb_update_required = True
+        bounds.set(index, body.get_AABB())
+    return bounds
+
+
+def assert_matches_brute_force(broad_phase, frames=10):
+    # Bodies drift, sleep, wake, leave and join between frames so incremental broad phases are checked too.
+    rng, bodies = make_scene(120, seed=7)
+    _, spares = make_scene(frames, seed=8)
+    brute_force = BruteForceBroadPhase()
+    for _ in range(frames):
+        bounds = bounds_of(bodies)
+        assert broad_phase.find_pairs(bodies, bounds) == brute_force.find_pairs(bodies, bounds)
+
+        for body in bodies:
+            body.position.x += rng.uniform(-30, 30)
+            body.position.y += rng.uniform(-30, 30)
+            if rng.random() < 0.1:
+                body.is_awake = not body.is_awake
+
+        bodies.pop(rng.randrange(len(bodies)))
+        bodies.insert(rng.randrange(len(bodies)), spares.pop())
+
+
+def test_spatial_hash_grid_matches_brute_force():
+    for cell_size in (16.0, 64.0, 500.0):
+        assert_matches_brute_force(SpatialHashGrid(cell_size))
+
+
+def test_sweep_and_prune_matches_brute_force():
+    for axis in (0, 1):
+        assert_matches_brute_force(SweepAndPrune(axis))
+
+
+def test_dynamic_tree_matches_brute_force():
+    for margin in (0.0, 2.0, 20.0):
+        assert_matches_brute_force(DynamicTreeBroadPhase(margin))
@@ -0,0 +1,207 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from AABB import AABB
+from body import Body
+from collisions import Collisions
+from matter import Matter
+from shape import Box, Circle
+from vector import Vector2
+from world import World
+
+
+def make_resting_box(**kwargs):
+    world = World(gravity=Vector2(0, -98.1), **kwargs)
+    ground = Body(Box(400, 20), Matter(density=0), 0, -10, is_static=True)
+    box = Body(Box(20, 20), Matter(density=1), 0, 10)
+    world.add_body([ground, box])
+    for _ in range(60):
+        world.step(1 / 60, 4)
+    return world, ground, box
+
+
+def test_snapshot_after_removing_a_resting_body():
+    for kwargs in (dict(warm_starting=True), dict(warm_starting=True, sequential_impulses=True)):
+        world, ground, box = make_resting_box(**kwargs)
+        assert len(world.contact_cache) == 1
+
+        world.remove_body(box)
+        assert len(world.contact_cache) == 0
+        assert not world.contacts
+
+        snapshot = world.snapshot()
+        clone = world.clone()
+        assert clone.body_count == 1
+        world.restore(snapshot)
+        world.step(1 / 60, 4)
+
+
+def test_raycast_finds_bodies_moved_between_steps():
+    for kwargs in (dict(), dict(array_backed=True)):
+        world = World(**kwargs)
+        wall = Body(Box(20, 200), Matter(density=0), 100, 0, is_static=True)
+        crate = Body(Box(20, 20), Matter(density=1), 0, 0)
+        world.add_body([wall, crate])
+        world.step(1 / 60)
+
+        crate.move_to(Vector2(1000, 1000))
+        hit = world.raycast(Vector2(970, 1000), Vector2(1030, 1000))
+        assert hit is not None and hit.body is crate
+
+        wall.move_to(Vector2(-500, 0))
+        assert world.raycast(Vector2(50, 0), Vector2(150, 0)) is None
+        assert world.raycast(Vector2(-600, 0), Vector2(-400, 0)).body is wall
+
+
+def test_shapecast_stops_short_of_the_first_body():
+    world = World()
+    wall = Body(Box(20, 200), Matter(density=0), 100, 0, is_static=True)
+    ball = Body(Circle(10), Matter(density=1), 0, 0)
+    world.add_body([wall, ball])
+
+    hit = world.shapecast(ball, Vector2(200, 0))
+    assert hit.body is wall
+    assert abs(hit.fraction * 200 - (80 - World.SHAPE_CAST_TARGET_SEPARATION)) < 1e-6
+    assert world.shapecast(ball, Vector2(0, 200)) is None
+    assert world.shapecast_many([(ball, Vector2(200, 0))], predicate=lambda body: not body.is_static) == [None]
+
+
+def test_queries_find_bodies_moved_between_steps():
+    world = World()
+    crate = Body(Box(20, 20), Matter(density=1), 0, 0)
+    ball = Body(Circle(10), Matter(density=1), 50, 0)
+    world.add_body([crate, ball])
+    world.step(1 / 60)
+
+    crate.move_to(Vector2(300, 300))
+    assert world.query_point(Vector2(300, 300)) == [crate]
+    assert world.get_body_by_position(300, 300) is crate
+    assert world.get_body_by_position(0, 0) is None
+    assert world.query_aabb(AABB(290, 290, 310, 310)) == [crate]
+    assert world.query_circle(Vector2(320, 300), 15) == [crate]
+
+    found = []
+    assert world.query_circle(Vector2(50, 0), 1, found) is found and found == [ball]
+
+
+def test_array_backed_fields_write_through_to_the_store():
+    world = World(array_backed=True)
+    bodies = [Body(Circle(10), Matter(density=1), 30 * i, 0) for i in range(3)]
+    world.add_body(bodies)
+    first, _, last = bodies
+
+    first.position.x = 5
+    last.linear_velocity.add_scaled(Vector2(1, 2), 3)
+    last.angle = 0.5
+    store = world.body_store
+    assert store.position[0][0] == 5
+    assert tuple(store.linear_velocity[2]) == (3, 6)
+    assert store.angle[2] == 0.5
+
+    world.remove_body(first)
+    assert type(first.position) is Vector2 and first.position.x == 5
+    assert (last.position.x, last.linear_velocity.y, last.angle) == (60, 6, 0.5)
+    last.position.y = 7
+    assert store.position[0][1] == 7
+
+
+def test_bouncy_resting_stack_settles_and_sleeps():
+    for iterations, kwargs in ((1, dict(warm_starting=True)), (2, dict(warm_starting=True)), (2, dict())):
+        world = World(gravity=Vector2(0, -98.1), allow_sleeping=True, sequential_impulses=True, **kwargs)
+        world.add_body(Body(Box(400, 20), Matter(density=0, restitution=1), 0, -10, is_static=True))
+        boxes = [Body(Box(20, 20), Matter(density=1, restitution=1), 0, 10 + 20 * k) for k in range(4)]
+        world.add_body(boxes)
+
+        for _ in range(180):
+            world.step(1 / 60, iterations)
+
+        assert not any(box.is_awake for box in boxes)
+        for k, box in enumerate(boxes):
+            assert abs(box.position.y - (10 + 20 * k)) < 0.5
+
+
+def test_bouncy_ball_still_bounces():
+    world = World(gravity=Vector2(0, -98.1), sequential_impulses=True)
+    world.add_body(Body(Box(400, 20), Matter(density=0, restitution=1), 0, -10, is_static=True))
+    ball = Body(Circle(10), Matter(density=1, restitution=1), 0, 110)
+    world.add_body(ball)
+
+    peak = None
+    for _ in range(180):
+        world.step(1 / 60, 2)
+        if ball.linear_velocity.y > 0:
+            peak = ball.position.y if peak is None else max(peak, ball.position.y)
+    assert peak is not None and peak > 90
+
+
+def make_pile(**kwargs):
+    world = World(gravity=Vector2(0, -98.1), sequential_impulses=True, warm_starting=True, **kwargs)
+    world.add_body(Body(Box(400, 20), Matter(density=0), 0, -10, is_static=True))
+    # Columns start with different overlaps, so their islands need different numbers of position iterations.
+    for column in range(6):
+        for row in range(4):
+            shape = Box(16, 16) if (column + row) % 2 else Circle(8)
+            world.add_body(Body(shape, Matter(density=1), column * 60 - 150 + row, 8 + row * (16 - column)))
+    return world
+
+
+def test_island_solving_matches_serial_solving():
+    with ThreadPoolExecutor(2) as executor:
+        worlds = [make_pile(), make_pile(executor=executor, parallel_island_threshold=0),
+                  make_pile(executor=executor, parallel_island_threshold=1000)]
+        for _ in range(120):
+            for world in worlds:
+                world.step(1 / 60, 2)
+
+    serial, packed, inline = ([(body.position.x, body.position.y, body.angle, body.linear_velocity.x,
+                                body.angular_velocity) for body in world.bodies] for world in worlds)
+    assert packed == serial
+    assert inline == serial
+
+
+def test_snapshot_replay_is_bit_identical():
+    for world in (make_pile(), make_pile(array_backed=True, allow_sleeping=True, batch_narrow_phase=True),
+                  make_resting_box()[0], make_resting_box(warm_starting=True, array_backed=True)[0]):
+        for _ in range(30):
+            world.step(1 / 60, 2)
+        snapshot = world.snapshot()
+
+        runs = []
+        for _ in range(2):
+            if runs:
+                world.restore(snapshot)
+            for _ in range(60):
+                world.step(1 / 60, 2)
+            runs.append([(body.position.x, body.position.y, body.angle, body.linear_velocity.x,
+                          body.linear_velocity.y, body.angular_velocity, body.is_awake) for body in world.bodies])
+        assert runs[0] == runs[1]
+
+
+def test_repeated_queries_skip_the_refresh_and_visit_few_candidates(monkeypatch):
+    world = World()
+    world.add_body([Body(Box(10, 10), Matter(density=1), (k % 20) * 30, (k // 20) * 30) for k in range(400)])
+    world.step(1 / 60)
+
+    calls = {'sync': 0, 'contains': 0}
+    sync_proxies = world.query_index.sync_proxies
+    contains_point = Collisions.contains_point
+
+    def count_sync(bodies):
+        calls['sync'] += 1
+        sync_proxies(bodies)
+
+    def count_contains(body, point):
+        calls['contains'] += 1
+        return contains_point(body, point)
+
+    monkeypatch.setattr(world.query_index, 'sync_proxies', count_sync)
+    monkeypatch.setattr(Collisions, 'contains_point', staticmethod(count_contains))
+
+    for k in range(100):
+        assert len(world.query_point(Vector2((k % 20) * 30, (k // 20) * 30))) == 1
+    assert calls['sync'] == 1
+    assert calls['contains'] <= 2 * 100
+
+    world.bodies[0].move_to(Vector2(-300, -300))
+    assert world.query_point(Vector2(-300, -300)) == [world.bodies[0]]
+    assert world.query_point(Vector2(0, 0)) == []
+    assert calls['sync'] == 2
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from body import Body
+from matter import Matter
+from shape import Box, Circle
+from vector import Vector2
+from world import World
+
+pytest.importorskip('numpy')
+from world_batch import WorldBatch  # noqa: E402
+
+
+def make_world(seed, **kwargs):
+    rng = random.Random(seed)
+    world = World(gravity=Vector2(0, -98.1), **kwargs)
+    world.add_body(Body(Box(400, 20), Matter(density=0), 0, -10, is_static=True))
+    for _ in range(10):
+        shape = Circle(rng.uniform(5, 12)) if rng.random() < 0.5 else Box(rng.uniform(10, 24), rng.uniform(10, 24))
+        world.add_body(Body(shape, Matter(density=1), rng.uniform(-150, 150), rng.uniform(20, 200)))
+    return world
+
+
+def poses(world):
+    return [(body.position.x, body.position.y, body.angle) for body in world.bodies]
+
+
+def test_batch_matches_stepping_worlds_one_by_one():
+    for kwargs in (dict(), dict(sequential_impulses=True, warm_starting=True, allow_sleeping=True)):
+        expected = [make_world(seed, **kwargs) for seed in range(4)]
+        for _ in range(60):
+            for world in expected:
+                world.step(1 / 60, 2)
+
+        worlds = [make_world(seed, **kwargs) for seed in range(4)]
+        WorldBatch(worlds).step(1 / 60, 2, steps=60)
+        assert [poses(world) for world in worlds] == [poses(world) for world in expected]
+
+        worlds = [make_world(seed, **kwargs) for seed in range(4)]
+        with WorldBatch(worlds, processes=2) as batch:
+            batch.step(1 / 60, 2, steps=60)
+            stepped = [[(x, y, angle) for (x, y), angle in zip(batch.position[batch.rows(index)].tolist(),
+                                                               batch.angle[batch.rows(index)].tolist())]
+                       for index in range(batch.world_count)]
+        assert stepped == [poses(world) for world in expected]
+
+
+def test_world_in_a_shared_batch_steps_only_its_own_bodies():
+    worlds = [make_world(seed, array_backed=True) for seed in range(2)]
+    WorldBatch(worlds)
+    before = poses(worlds[1])
+    for _ in range(10):
+        worlds[0].step(1 / 60, 2)
+    assert poses(worlds[1]) == before
+
+
+def test_batched_worlds_keep_their_bodies():
+    worlds = [make_world(seed) for seed in range(2)]
+    WorldBatch(worlds)
+    with pytest.raises(ValueError):
+        worlds[0].remove_body(worlds[0].bodies[1])
+    with pytest.raises(ValueError):
+        worlds[1].add_body(Body(Circle(5), Matter(density=1), 0, 50))
+    with pytest.raises(ValueError):
+        worlds[1].clear()
+    with pytest.raises(ValueError):
+        WorldBatch(worlds)
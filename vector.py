@@ -1,6 +1,8 @@
 import math
 
 class Vector2:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x: float = 0.0, y: float = 0.0):
         self.x = x
         self.y = y
@@ -23,6 +25,21 @@ class Vector2:
     def __ne__(self, other: 'Vector2') -> bool:
         return not self.__eq__(other)
 
+    def __iadd__(self, other: 'Vector2') -> 'Vector2':
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other: 'Vector2') -> 'Vector2':
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __imul__(self, scalar: float) -> 'Vector2':
+        self.x *= scalar
+        self.y *= scalar
+        return self
+
     def __neg__(self) -> 'Vector2':
         return Vector2(-self.x, -self.y)
 
@@ -74,6 +91,31 @@ class Vector2:
         self.x = 0.0
         self.y = 0.0
 
+    def copy(self) -> 'Vector2':
+        return Vector2(self.x, self.y)
+
+    def add_scaled(self, other: 'Vector2', scalar: float) -> 'Vector2':
+        # In-place self += other * scalar without the temporary vector.
+        self.x += other.x * scalar
+        self.y += other.y * scalar
+        return self
+
+    def sub_scaled(self, other: 'Vector2', scalar: float) -> 'Vector2':
+        self.x -= other.x * scalar
+        self.y -= other.y * scalar
+        return self
+
+    def lerp(self, other: 'Vector2', t: float) -> 'Vector2':
+        return Vector2(self.x + (other.x - self.x) * t, self.y + (other.y - self.y) * t)
+
+    def perp_dot(self, other: 'Vector2') -> float:
+        # Dot product of the left perpendicular (-y, x) with other.
+        return -self.y * other.x + self.x * other.y
+
+    def cross_scalar(self, scalar: float) -> 'Vector2':
+        # scalar x self, the velocity of offset self on a body spinning at scalar rad/s.
+        return Vector2(-scalar * self.y, scalar * self.x)
+
     @staticmethod
     def transform(v: 'Vector2', transform) -> 'Vector2':
         x = transform.cos * v.x - transform.sin * v.y + transform.position_x
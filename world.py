@@ -1,20 +1,102 @@
+import math
+from concurrent.futures import Executor
+from itertools import chain
 from typing import Union, List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from AABB import AABB, AABBArray
+from axis_cache import AxisCache
 from body import Body
+from batch_collisions import BatchCollisions
+from body_store import BodyStore
+from broad_phase import BroadPhase, BruteForceBroadPhase, DynamicTreeBroadPhase, StaticIndex
 from collisions import Collisions
+from contact_cache import ContactCache
+from contact_solver import ContactSolver
+from island import Island
+from island_solver import IslandSolver
 from manifold import Manifold
+from raycast import RaycastHit
+from simulation import SimulationResult
+from snapshot import WorldSnapshot
+from transform import Transform
 from vector import Vector2
 
 class World:
     MIN_ITERATIONS = 1
     MAX_ITERATIONS = 16
 
-    def __init__(self, gravity: Vector2 = Vector2(0, -9.81), damping: float = 0.0):
+    SLEEP_LINEAR_TOLERANCE = 0.5
+    SLEEP_ANGULAR_TOLERANCE = 0.035
+    TIME_TO_SLEEP = 0.5
+    WAKE_MARGIN = 1.0
+
+    BULLET_TARGET_SEPARATION = 0.25
+    MAX_BULLET_SUB_STEPS = 4
+    SHAPE_CAST_TARGET_SEPARATION = 0.25
+
+    MAX_FRAME_TIME = 0.25
+    MAX_STEPS_PER_FRAME = 8
+
+    def __init__(self, gravity: Vector2 = Vector2(0, -9.81), damping: float = 0.0,
+                 broad_phase: BroadPhase = None, array_backed: bool = False, batch_narrow_phase: bool = False,
+                 allow_sleeping: bool = False, warm_starting: bool = False, sequential_impulses: bool = False,
+                 velocity_iterations: int = 8, position_iterations: int = 3,
+                 executor: Executor = None, parallel_island_threshold: int = 16):
         self.gravity = gravity
         self.damping = damping
+        self.allow_sleeping = allow_sleeping
+        self.warm_starting = warm_starting
+        self.sequential_impulses = sequential_impulses
+        # Sequential-impulse solver passes per substep; step's iterations argument sets the number of substeps.
+        self.velocity_iterations = velocity_iterations
+        self.position_iterations = position_iterations
+        if executor is not None and not sequential_impulses:
+            raise ValueError("Parallel island solving requires sequential impulses.")
+        self.executor = executor
+        self.parallel_island_threshold = parallel_island_threshold
+        # Slower approaches are resting contact rather than impacts and do not bounce; set for each step's substep.
+        self.restitution_threshold = ContactSolver.RESTITUTION_THRESHOLD
+        self.contact_cache = ContactCache()
+        self.axis_cache = AxisCache()
+        self.broad_phase_method: BroadPhase = broad_phase if broad_phase is not None else BruteForceBroadPhase()
+        self.static_index = StaticIndex()
+        # Dynamic bodies for ray casts, shared with the broad phase when it already keeps a tree.
+        if isinstance(self.broad_phase_method, DynamicTreeBroadPhase):
+            self.query_index = self.broad_phase_method
+        else:
+            self.query_index = DynamicTreeBroadPhase()
+        self.body_store: BodyStore | None = BodyStore() if array_backed else None
+        # Set by WorldBatch, whose rows follow each world's body order, so the set of bodies is then fixed.
+        self.batched = False
+        self.batch_narrow_phase = batch_narrow_phase
+        if batch_narrow_phase:
+            BatchCollisions.require_numpy()
         self.bodies: List[Body] = []
+        self.bounds = AABBArray()
+        self.bounds_valid = False
+        self.bounds_rows = None
+        # Bumped by anything that may move or replace bodies; with Body.moves it tells queries when to refresh.
+        self.version = 0
+        self.query_index_version = None
         self.contact_pairs: List[(int, int)] = []
+        # Body pairs whose AABBs started or stopped overlapping in the last broad phase, static pairs included.
+        self.overlapping_pairs = set()
+        self.added_pairs: List[(Body, Body)] = []
+        self.removed_pairs: List[(Body, Body)] = []
+
+        self.accumulator = 0.0
+        self.interpolation_alpha = 1.0
+        self.previous_poses = {}
 
         self.contact_points: List[tuple[int, int]] = []
+        self.contacts: List[Manifold] = []
+        self.islands: List[Island] = []
+        self.moved_static_bounds: List[AABB] = []
 
         self.contact_list: List[Vector2] = []
         self.impulse_list: List[Vector2] = []
@@ -28,30 +110,90 @@ class World:
         return len(self.bodies)
 
     def add_body(self, body: Union[List[Body], Body]):
+        if self.batched:
+            raise ValueError("Bodies cannot be added to or removed from a batched world.")
         if isinstance(body, list):
             if any(not isinstance(b, Body) for b in body):
                 raise TypeError("All items in the list must be instances of 'Body'.")
-            self.bodies.extend(body)
+            for b in body:
+                self.add_body(b)
         else:
             if not isinstance(body, Body):
                 raise TypeError("Expected 'Body' instance.")
             self.bodies.append(body)
+            self.bounds_valid = False
+            self.version += 1
+            if body.is_static:
+                self.static_index.add(body)
+            if self.body_store is not None:
+                self.body_store.add(body)
 
     def remove_body(self, body: Union[List[Body], Body]):
+        if self.batched:
+            raise ValueError("Bodies cannot be added to or removed from a batched world.")
         if isinstance(body, list):
             for b in body:
                 if not isinstance(b, Body):
                     raise TypeError("Expected 'Body' instance.")
-                if b in self.bodies:
-                    self.bodies.remove(b)
+                self.remove_body(b)
         else:
             if not isinstance(body, Body):
                 raise TypeError("Expected 'Body' instance.")
             if body in self.bodies:
+                # Whatever rested on the body would otherwise sleep on in mid-air.
+                self.wake_region(body.get_AABB())
                 self.bodies.remove(body)
+                self.bounds_valid = False
+                self.version += 1
+                self.previous_poses.pop(body, None)
+                self.static_index.remove(body)
+                self.contact_cache.remove(body)
+                self.axis_cache.remove(body)
+                self.contacts[:] = [contact for contact in self.contacts
+                                    if contact.bodyA is not body and contact.bodyB is not body]
+                # Pair indices shift with the removal, and the next broad phase rebuilds them anyway.
+                self.contact_pairs.clear()
+                if self.body_store is not None:
+                    self.body_store.remove(body)
 
     def clear(self):
+        if self.batched:
+            raise ValueError("Bodies cannot be added to or removed from a batched world.")
+        if self.body_store is not None:
+            self.body_store.clear()
         self.bodies.clear()
+        self.bounds_valid = False
+        self.version += 1
+        self.static_index.clear()
+        self.contact_cache.clear()
+        self.axis_cache.clear()
+        self.contacts.clear()
+        self.contact_pairs.clear()
+        self.previous_poses.clear()
+        self.moved_static_bounds.clear()
+        self.overlapping_pairs = set()
+        self.added_pairs = []
+        self.removed_pairs = []
+
+    def snapshot(self) -> bytes:
+        return WorldSnapshot.capture(self)
+
+    def restore(self, snapshot: bytes):
+        WorldSnapshot.restore(self, snapshot)
+        self.version += 1
+        # Restoring flags every static body as moved, which must not wake the bodies resting on it.
+        self.update_bounds()
+        self.moved_static_bounds.clear()
+        # Restored bodies jump, so they are drawn at their new pose rather than blended towards it.
+        self.previous_poses.clear()
+
+    def clone(self) -> 'World':
+        world = World(self.gravity, self.damping, self.broad_phase_method.clone(), self.body_store is not None,
+                      self.batch_narrow_phase, self.allow_sleeping, self.warm_starting, self.sequential_impulses,
+                      self.velocity_iterations, self.position_iterations, self.executor, self.parallel_island_threshold)
+        world.add_body([body.clone() for body in self.bodies])
+        world.restore(self.snapshot())
+        return world
 
     def get_body(self, index: int) -> Body:
         if index < 0 or index >= self.body_count:
@@ -59,60 +201,578 @@ class World:
         return self.bodies[index]
 
     def get_body_by_position(self, x, y):
-        for body in self.bodies:
-            if body.shape.contains_point(body.position, Vector2(x, y)):
-                return body
-        return None
+        bodies = self.query_point(Vector2(x, y))
+        return bodies[0] if bodies else None
+
+    def update_query_index(self):
+        # Runs before every query, so bodies moved by hand between steps are found where they are now. Nothing is
+        # refreshed unless a step, a move or a change of bodies happened since the last query, and then only bodies
+        # flagged as moved are; a leaf only moves once its AABB leaves the fat box around it.
+        version = (self.version, Body.moves)
+        if version == self.query_index_version:
+            return
+        self.update_transforms()
+        self.update_bounds()
+        self.query_index.sync_proxies([body for body in self.bodies if not body.is_static])
+        self.query_index_version = version
+
+    def query_point(self, point: Vector2, out: List[Body] = None):
+        # Like the other queries, returns a new list of matching bodies, or fills out (cleared first) and returns it.
+        self.update_query_index()
+        candidates = chain(self.query_index.query_point(point.x, point.y),
+                           self.static_index.query_point(point.x, point.y))
+        return World.collect((body for body in candidates if Collisions.contains_point(body, point)), out)
+
+    def query_aabb(self, aabb: AABB, out: List[Body] = None):
+        self.update_query_index()
+        candidates = chain(self.query_index.query_aabb(aabb), self.static_index.query(aabb))
+        return World.collect((body for body in candidates if Collisions.overlaps_aabb(body, aabb)), out)
+
+    def query_circle(self, center: Vector2, radius: float, out: List[Body] = None):
+        if radius < 0:
+            raise ValueError("Radius must be a positive value.")
+
+        self.update_query_index()
+        aabb = AABB(center.x - radius, center.y - radius, center.x + radius, center.y + radius)
+        candidates = chain(self.query_index.query_aabb(aabb), self.static_index.query(aabb))
+        return World.collect((body for body in candidates if Collisions.overlaps_circle(body, center, radius)), out)
 
-    def step(self, dt: float, iterations: int = 1):
+    @staticmethod
+    def collect(bodies, out: List[Body] = None) -> List[Body]:
+        # Always drained here, since adding or removing a body while a lazy walk is paused would change the index.
+        if out is None:
+            return list(bodies)
+        out.clear()
+        out.extend(bodies)
+        return out
+
+    def raycast(self, p1: Vector2, p2: Vector2, predicate=None) -> RaycastHit | None:
+        # Closest body along the segment p1 -> p2; bodies containing p1 or failing predicate(body) are skipped.
+        self.update_query_index()
+        return self.cast_ray(p1, p2, predicate)
+
+    def raycast_all(self, p1: Vector2, p2: Vector2, predicate=None) -> List[RaycastHit]:
+        self.update_query_index()
+        hits = []
+        self.cast_ray(p1, p2, predicate, hits)
+        hits.sort(key=lambda hit: hit.fraction)
+        return hits
+
+    def raycast_many(self, rays, predicate=None) -> List[RaycastHit | None]:
+        # rays is a sequence of (p1, p2) pairs; the index is refitted once for the whole batch.
+        self.update_query_index()
+        return [self.cast_ray(p1, p2, predicate) for p1, p2 in rays]
+
+    def cast_ray(self, p1: Vector2, p2: Vector2, predicate, hits: List[RaycastHit] = None) -> RaycastHit | None:
+        # Returns the closest hit, or appends every hit to hits when it is given.
+        closest = [None, None, 1.0]
+
+        def callback(body, p1, p2, max_fraction):
+            if predicate is not None and not predicate(body):
+                return -1.0
+
+            hit, normal, fraction = Collisions.raycast(body, p1, p2, max_fraction)
+            if not hit:
+                return -1.0
+
+            if hits is not None:
+                hits.append(RaycastHit(body, p1.lerp(p2, fraction), normal, fraction))
+                return -1.0
+
+            if closest[0] is None or fraction < closest[2]:
+                closest[:] = body, normal, fraction
+            return fraction
+
+        # Dynamic hits clip the ray before the static tree is walked.
+        self.query_index.raycast(p1, p2, callback)
+        self.static_index.raycast(p1, p2, callback, closest[2])
+
+        body, normal, fraction = closest
+        if body is None:
+            return None
+        return RaycastHit(body, p1.lerp(p2, fraction), normal, fraction)
+
+    def shapecast(self, body: Body, translation: Vector2, predicate=None) -> RaycastHit | None:
+        # First body that body's shape touches when swept by translation from its current pose, stopping
+        # SHAPE_CAST_TARGET_SEPARATION short; bodies it already overlaps or failing predicate(other) are skipped.
+        self.update_query_index()
+        return self.cast_shape(body, translation, predicate)
+
+    def shapecast_many(self, casts, predicate=None) -> List[RaycastHit | None]:
+        # casts is a sequence of (body, translation) pairs; the index is refreshed once for the whole batch.
+        self.update_query_index()
+        return [self.cast_shape(body, translation, predicate) for body, translation in casts]
+
+    def cast_shape(self, body: Body, translation: Vector2, predicate) -> RaycastHit | None:
+        start = body.position.copy()
+        end = start + translation
+        angle = body.angle
+        radius = body.shape.bounding_radius
+        swept = AABB(min(start.x, end.x) - radius, min(start.y, end.y) - radius,
+                     max(start.x, end.x) + radius, max(start.y, end.y) + radius)
+
+        closest = None
+        for other in chain(self.query_index.query_aabb(swept), self.static_index.query(swept)):
+            if other is body or (predicate is not None and not predicate(other)):
+                continue
+
+            hit, normal, point, fraction = Collisions.time_of_impact(
+                body, start, angle, end, angle, other, self.SHAPE_CAST_TARGET_SEPARATION)
+            if hit and (closest is None or fraction < closest.fraction):
+                closest = RaycastHit(other, point, normal, fraction)
+        return closest
 
+    def step(self, dt: float, iterations: int = 1):
+        # iterations counts substeps of dt / iterations, each with its own detection pass; in sequential-impulse mode
+        # every substep then runs velocity_iterations and position_iterations solver passes.
         iterations = max(min(iterations, self.MAX_ITERATIONS), self.MIN_ITERATIONS)
+        self.restitution_threshold = ContactSolver.scaled_restitution_threshold(self.gravity, dt / iterations)
+
+        if self.sequential_impulses:
+            for _ in range(iterations):
+                self.broad_phase()
+                self.find_contacts()
+                self.integrate_velocities(dt, iterations)
+                bullets = self.begin_bullets()
+                if self.executor is not None:
+                    self.solve_islands(dt / iterations)
+                else:
+                    self.solve_contacts(dt / iterations)
+                self.advance_bullets(bullets, dt / iterations)
+        else:
+            for _ in range(iterations):
+                self.contact_list.clear()
+                bullets = self.begin_bullets()
+                self.step_bodies(dt, iterations)
+                self.advance_bullets(bullets, dt / iterations)
+                self.broad_phase()
+                self.narrow_phase()
+
+        if self.allow_sleeping:
+            self.update_sleep(dt)
+        self.version += 1
+
+    def advance(self, frame_dt: float, dt: float = 1 / 60, iterations: int = 1) -> int:
+        # Steps in fixed increments of dt through the time a frame took, carrying the remainder over to the next frame,
+        # and returns the number of steps taken. Rendering reads the interpolated pose, which blends the last two steps
+        # by the share of a step left over.
+        if dt <= 0:
+            raise ValueError("Time step must be a positive value.")
+        if frame_dt < 0:
+            raise ValueError("Frame time must be a positive value.")
+
+        # A long stall, like a breakpoint or a dragged window, is not caught up on.
+        self.accumulator += min(frame_dt, self.MAX_FRAME_TIME)
+
+        steps = 0
+        while self.accumulator >= dt:
+            if steps == self.MAX_STEPS_PER_FRAME:
+                # Steps slower than dt would need more of them every frame, so the backlog is dropped instead.
+                self.accumulator %= dt
+                break
+
+            # Only the poses before the frame's last step are blended from.
+            if self.accumulator < 2 * dt or steps == self.MAX_STEPS_PER_FRAME - 1:
+                self.previous_poses = {body: (body.position.copy(), body.angle)
+                                       for body in self.bodies if not body.is_static}
+
+            self.step(dt, iterations)
+            self.accumulator -= dt
+            steps += 1
+
+        self.interpolation_alpha = self.accumulator / dt
+        return steps
+
+    def interpolated_position(self, body: Body) -> Vector2:
+        previous = self.previous_poses.get(body)
+        if previous is None:
+            return body.position.copy()
+        return previous[0].lerp(body.position, self.interpolation_alpha)
+
+    def interpolated_angle(self, body: Body) -> float:
+        previous = self.previous_poses.get(body)
+        if previous is None:
+            return body.angle
+        return previous[1] + (body.angle - previous[1]) * self.interpolation_alpha
+
+    def interpolated_vertices(self, body: Body) -> List[Vector2]:
+        position = self.interpolated_position(body)
+        transform = Transform(position.x, position.y, self.interpolated_angle(body))
+        return [Vector2.transform(v, transform) for v in body.shape.vertices]
+
+    def simulate(self, max_time: float, dt: float = 1 / 60, iterations: int = 1,
+                 predicate=None, stop_at_rest: bool = True, track: List[Body] = None,
+                 linear_tolerance: float = None, angular_tolerance: float = None) -> SimulationResult:
+        # Steps headless until max_time, until every dynamic body has rested for TIME_TO_SLEEP,
+        # or until predicate(body) holds for some dynamic body.
+        if dt <= 0:
+            raise ValueError("Time step must be a positive value.")
+
+        linear_tolerance = self.SLEEP_LINEAR_TOLERANCE if linear_tolerance is None else linear_tolerance
+        angular_tolerance = self.SLEEP_ANGULAR_TOLERANCE if angular_tolerance is None else angular_tolerance
+
+        max_steps = max(math.ceil(max_time / dt - 1e-9), 0)
+        track = track if track is not None else []
+        trajectories = [[body.position.copy()] for body in track]
+
+        reason = SimulationResult.TIME
+        triggered_bodies = []
+        rest_time = 0.0
+        steps = 0
+        while steps < max_steps:
+            self.step(dt, iterations)
+            steps += 1
+
+            for body, trajectory in zip(track, trajectories):
+                trajectory.append(body.position.copy())
+
+            if predicate is not None:
+                triggered_bodies = [body for body in self.bodies if not body.is_static and predicate(body)]
+                if triggered_bodies:
+                    reason = SimulationResult.PREDICATE
+                    break
+
+            if stop_at_rest:
+                rest_time = rest_time + dt if self.is_at_rest(linear_tolerance, angular_tolerance) else 0.0
+                if rest_time >= self.TIME_TO_SLEEP:
+                    reason = SimulationResult.REST
+                    break
+
+        return SimulationResult(reason, steps, steps * dt,
+                                [body.position.copy() for body in self.bodies], [body.angle for body in self.bodies],
+                                triggered_bodies, trajectories)
+
+    def is_at_rest(self, linear_tolerance: float = None, angular_tolerance: float = None) -> bool:
+        linear_tolerance = self.SLEEP_LINEAR_TOLERANCE if linear_tolerance is None else linear_tolerance
+        angular_tolerance = self.SLEEP_ANGULAR_TOLERANCE if angular_tolerance is None else angular_tolerance
+
+        if self.body_store is not None:
+            store = self.body_store
+            active = store.active_rows(self.store_rows())
+            if active.size == 0:
+                return True
+            velocity = store.linear_velocity[active]
+            linear_sq = velocity[:, 0] * velocity[:, 0] + velocity[:, 1] * velocity[:, 1]
+            return bool((linear_sq <= linear_tolerance ** 2).all() and
+                        (abs(store.angular_velocity[active]) <= angular_tolerance).all())
+
+        linear_tolerance_sq = linear_tolerance ** 2
+        for body in self.bodies:
+            if body.is_static or not body.is_awake:
+                continue
+            if (body.linear_velocity.length_squared() > linear_tolerance_sq or
+                    abs(body.angular_velocity) > angular_tolerance):
+                return False
+        return True
+
+    def update_transforms(self):
+        # One pass over every moved polygon, ahead of the AABB and narrow-phase reads of its vertices.
+        if self.body_store is not None:
+            bodies = self.body_store.transform_dirty_bodies(self.store_rows())
+        else:
+            bodies = [body for body in self.bodies if body.transform_update_required]
+
+        for body in bodies:
+            if body.transformed_vertices is not None:
+                body.update_transformed_vertices()
+
+    def store_rows(self):
+        # This world's rows of the body store, which a WorldBatch shares between several worlds.
+        if self.bounds_valid:
+            return self.bounds_rows
+        return np.array([body.store_index for body in self.bodies], dtype=np.intp)
+
+    def update_bounds(self):
+        # One pass over the bodies whose AABB went stale, writing the flat rows every broad phase reads.
+        bodies = self.bodies
+        bounds = self.bounds
+        if not self.bounds_valid:
+            bounds.resize(len(bodies))
+            if self.body_store is not None:
+                self.bounds_rows = self.store_rows()
+            self.bounds_valid = True
+            dirty = range(len(bodies))
+        elif self.body_store is not None:
+            dirty = np.flatnonzero(self.body_store.aabb_update_required[self.bounds_rows]).tolist()
+        else:
+            dirty = [index for index, body in enumerate(bodies) if body.aabb_update_required]
 
-        for _ in range(iterations):
-            self.contact_list.clear()
-            self.step_bodies(dt, iterations)
-            self.broad_phase()
-            self.narrow_phase()
+        for index in dirty:
+            body = bodies[index]
+            moved = body.aabb_update_required
+            bounds.set(index, body.get_AABB())
+            if moved and body.is_static:
+                previous = self.static_index.move(body)
+                if previous is not None:
+                    self.moved_static_bounds.append(previous.union(body.AABB))
 
     def broad_phase(self):
         self.contact_pairs.clear()
-        for i in range(self.body_count - 1):
-            bodyA = self.bodies[i]
-            bodyA.AABB = bodyA.get_AABB()
+        self.update_transforms()
+        self.update_bounds()
+        bounds = self.bounds
+
+        # Sleeping bodies are never paired with static ones, so those around a moved static body are woken here.
+        moved_static_bounds, self.moved_static_bounds = self.moved_static_bounds, []
+        for aabb in moved_static_bounds:
+            self.wake_region(aabb)
+
+        dynamic_bodies = []
+        dynamic_indices = []
+        static_indices = {}
+        for index, body in enumerate(self.bodies):
+            if body.is_static:
+                static_indices[body] = index
+            else:
+                dynamic_bodies.append(body)
+                dynamic_indices.append(index)
 
-            for j in range(i + 1, self.body_count):
-                bodyB = self.bodies[j]
-                bodyB.AABB = bodyB.get_AABB()
+        for a, b in self.broad_phase_method.find_pairs(dynamic_bodies, bounds.select(dynamic_indices)):
+            self.contact_pairs.append((dynamic_indices[a], dynamic_indices[b]))
 
-                if bodyA.is_static and bodyB.is_static:
+        if static_indices:
+            for k, body in enumerate(dynamic_bodies):
+                if not body.is_awake:
                     continue
 
-                if not Collisions.intersect_aabbs(bodyA.AABB, bodyB.AABB):
-                    continue
+                i = dynamic_indices[k]
+                for static_body in self.static_index.query(body.AABB):
+                    j = static_indices[static_body]
+                    if not bounds.overlaps(i, j):
+                        continue
+
+                    self.contact_pairs.append((i, j) if i < j else (j, i))
 
-                self.contact_pairs.append((i, j))
+        self.contact_pairs.sort()
+
+        bodies = self.bodies
+        pairs = [(bodies[i], bodies[j]) for i, j in self.contact_pairs]
+        current = set(pairs)
+        previous = self.overlapping_pairs
+        self.added_pairs = [pair for pair in pairs if pair not in previous]
+        self.removed_pairs = [pair for pair in previous if pair not in current]
+        self.overlapping_pairs = current
+
+    def detect_collision(self, bodyA, bodyB, results, k):
+        if results is None:
+            collision, normal, depth = Collisions.collide(bodyA, bodyB, self.axis_cache)
+            contacts = None
+        else:
+            collision, normal, depth, contacts = results[k]
+
+        if collision and contacts is None and Collisions.is_polygon(bodyA) and Collisions.is_polygon(bodyB):
+            # Polygon manifolds are clipped on the overlapping pose, before the bodies are pushed apart.
+            axis = self.axis_cache.get(bodyA, bodyB) if results is None else None
+            contacts = Collisions.find_contact_points(bodyA, bodyB, normal, axis)
+        return collision, normal, depth, contacts
 
     def narrow_phase(self):
-        for pair in self.contact_pairs:
+        self.collect_contacts(self.resolve_contact)
+
+    def find_contacts(self):
+        self.collect_contacts(None)
+
+    def collect_contacts(self, resolve):
+        # Tests every broad-phase pair in order, waking colliding bodies and building and caching their manifolds.
+        # The legacy resolver passes resolve, which separates each pair and resolves it before the next is tested.
+        self.contacts.clear()
+        self.axis_cache.begin()
+        if self.warm_starting:
+            self.contact_cache.begin()
+        results = BatchCollisions.collide_pairs(self.bodies, self.contact_pairs) if self.batch_narrow_phase else None
+        # Batched results are taken on the poses before this pass, so pairs touching a body pushed since are retested.
+        moved = set()
+
+        for k, pair in enumerate(self.contact_pairs):
             i, j = pair
             bodyA = self.bodies[i]
             bodyB = self.bodies[j]
 
-            collision, normal, depth = Collisions.collide(bodyA, bodyB)
+            stale = i in moved or j in moved
+            collision, normal, depth, contacts = self.detect_collision(bodyA, bodyB, None if stale else results, k)
 
             if collision:
+                if not bodyA.is_awake:
+                    bodyA.wake()
+                if not bodyB.is_awake:
+                    bodyB.wake()
+
+                if resolve is not None:
+                    self.separate_bodies(bodyA, bodyB, normal * depth)
+                    if results is not None:
+                        if not bodyA.is_static:
+                            moved.add(i)
+                        if not bodyB.is_static:
+                            moved.add(j)
+                        if not (Collisions.is_polygon(bodyA) and Collisions.is_polygon(bodyB)):
+                            # Circle contacts are found after the push, as on the scalar path.
+                            contacts = None
+                if contacts is None:
+                    contacts = Collisions.find_contact_points(bodyA, bodyB)
+                contact1, contact2, contact_count, ids = contacts
+                contact = Manifold(bodyA, bodyB, normal, depth, contact1, contact2, contact_count, ids)
+                self.contacts.append(contact)
+                if self.warm_starting:
+                    self.contact_cache.update(contact)
+                if resolve is not None:
+                    resolve(contact)
+
+    def resolve_contact(self, contact: Manifold):
+        # self.resolve_collision_basic(contact)
+        if self.warm_starting:
+            self.resolve_collision_with_warm_start(contact)
+        else:
+            self.resolve_collision_with_rotation_and_friction(contact)
+
+    def solve_contacts(self, dt: float):
+        solver = self.solve_velocities()
+        self.integrate_positions(dt)
+        self.solve_positions(solver)
+
+    def solve_velocities(self) -> ContactSolver:
+        solver = ContactSolver(self.contacts, self.warm_starting, self.restitution_threshold)
+        solver.initialize()
+        solver.warm_start()
+        for _ in range(self.velocity_iterations):
+            solver.solve_velocity_constraints()
+        return solver
+
+    def solve_positions(self, solver: ContactSolver):
+        # Each island stops once its own contacts are resolved, exactly as solve_islands does.
+        constraints = dict(zip(self.contacts, solver.constraints))
+        for island in Island.build(self.bodies, self.contacts):
+            island_constraints = [constraints[contact] for contact in island.contacts]
+            for _ in range(self.position_iterations):
+                if solver.solve_position_constraints(island_constraints):
+                    break
+
+    def solve_islands(self, dt: float):
+        # Islands share no dynamic body, so each one is solved on its own and written back in island order.
+        self.islands = Island.build(self.bodies, self.contacts)
+
+        pending = []
+        for island in self.islands:
+            if len(island.contacts) < self.parallel_island_threshold:
+                IslandSolver.solve(island.bodies, island.contacts, dt, self.warm_starting, self.restitution_threshold,
+                                   self.velocity_iterations, self.position_iterations)
+            else:
+                bodies, contacts = IslandSolver.pack(island)
+                future = self.executor.submit(IslandSolver.solve, bodies, contacts, dt, self.warm_starting,
+                                              self.restitution_threshold, self.velocity_iterations,
+                                              self.position_iterations)
+                pending.append((island, future))
 
-                self.separate_bodies(bodyA, bodyB, normal * depth)
-                contact1, contact2, contact_count = Collisions.find_contact_points(bodyA, bodyB)
-                contact = Manifold(bodyA, bodyB, normal, depth, contact1, contact2, contact_count)
-                # self.resolve_collision_basic(contact)
-                self.resolve_collision_with_rotation_and_friction(contact)
+        for island, future in pending:
+            IslandSolver.unpack(island, future.result())
 
     def step_bodies(self, dt: float, total_iterations: int):
+        if self.body_store is not None:
+            self.body_store.integrate(dt, self.gravity, self.damping, total_iterations, self.store_rows())
+            return
+
         for body in self.bodies:
+            if not body.is_awake:
+                continue
             body.linear_velocity *= 1 - self.damping * dt
             body.step(dt, self.gravity, total_iterations)
 
+    def integrate_velocities(self, dt: float, total_iterations: int):
+        if self.body_store is not None:
+            self.body_store.integrate_velocities(dt, self.gravity, self.damping, total_iterations, self.store_rows())
+            return
+
+        for body in self.bodies:
+            if not body.is_awake:
+                continue
+            body.linear_velocity *= 1 - self.damping * dt
+            body.integrate_velocity(dt / total_iterations, self.gravity)
+
+    def integrate_positions(self, dt: float):
+        if self.body_store is not None:
+            self.body_store.integrate_positions(dt, self.store_rows())
+            return
+
+        for body in self.bodies:
+            if body.is_awake:
+                body.integrate_position(dt)
+
+    def begin_bullets(self):
+        # Poses of the awake bullets before this substep moves them.
+        return [(body, body.position.copy(), body.angle) for body in self.bodies
+                if body.is_bullet and body.is_awake and not body.is_static]
+
+    def advance_bullets(self, bullets, dt: float):
+        for body, start, start_angle in bullets:
+            self.advance_bullet(body, start, start_angle, dt)
+
+    def advance_bullet(self, body: Body, start: Vector2, start_angle: float, dt: float):
+        # Sweeps the substep's motion against static bodies. On a hit the body goes back to the time of impact, takes
+        # the collision impulse there and sub-steps on its own through the rest of the substep with its new velocity.
+        # If the sub-steps run out it stays at the last impact, so it never ends up past a wall.
+        radius = body.shape.bounding_radius
+        for sub_step in range(self.MAX_BULLET_SUB_STEPS):
+            end = body.position.copy()
+            end_angle = body.angle
+            swept = AABB(min(start.x, end.x) - radius, min(start.y, end.y) - radius,
+                         max(start.x, end.x) + radius, max(start.y, end.y) + radius)
+
+            impact = None
+            for other in self.static_index.query(swept):
+                hit, normal, point, fraction = Collisions.time_of_impact(
+                    body, start, start_angle, end, end_angle, other, self.BULLET_TARGET_SEPARATION)
+                if hit and (impact is None or fraction < impact[3]):
+                    impact = other, normal, point, fraction
+
+            if impact is None:
+                return
+
+            other, normal, point, fraction = impact
+            body.move_to(start.lerp(end, fraction))
+            body.rotate_to(start_angle + (end_angle - start_angle) * fraction)
+            self.resolve_collision_with_rotation_and_friction(Manifold(other, body, normal, 0.0, point, Vector2(), 1))
+            # The impulse at a corner can go mostly into spin, so whatever approach the body keeps is taken out here
+            # rather than left to push it through on a later substep.
+            approach = body.linear_velocity.dot(normal)
+            if approach < 0.0:
+                body.linear_velocity = body.linear_velocity.sub_scaled(normal, approach)
+
+            if sub_step == self.MAX_BULLET_SUB_STEPS - 1:
+                return
+
+            dt *= 1.0 - fraction
+            start = body.position.copy()
+            start_angle = body.angle
+            body.integrate_position(dt)
+
+    def update_sleep(self, dt: float):
+        self.islands = Island.build(self.bodies, self.contacts)
+
+        linear_tolerance_sq = self.SLEEP_LINEAR_TOLERANCE ** 2
+        for island in self.islands:
+            min_sleep_time = float('inf')
+            for body in island.bodies:
+                if (body.linear_velocity.length_squared() > linear_tolerance_sq or
+                        abs(body.angular_velocity) > self.SLEEP_ANGULAR_TOLERANCE):
+                    body.sleep_time = 0.0
+                else:
+                    body.sleep_time += dt
+                min_sleep_time = min(min_sleep_time, body.sleep_time)
+
+            if min_sleep_time >= self.TIME_TO_SLEEP:
+                for body in island.bodies:
+                    body.sleep()
+
+    def wake_region(self, aabb: AABB):
+        # Sleeping bodies keep no contacts, so the islands resting in aabb are found again by flooding through
+        # the bodies whose AABBs touch, and every sleeping body reached wakes.
+        pending = [aabb]
+        while pending:
+            region = pending.pop().expanded(self.WAKE_MARGIN)
+            for body in self.query_aabb(region):
+                if not body.is_static and not body.is_awake:
+                    body.wake()
+                    pending.append(body.get_AABB())
+
     @staticmethod
     def separate_bodies(bodyA, bodyB, mtv):
         if bodyA.is_static:
@@ -141,8 +801,8 @@ class World:
 
         impulse = j * normal
 
-        bodyA.linear_velocity -= impulse * bodyA.inv_mass
-        bodyB.linear_velocity += impulse * bodyB.inv_mass
+        bodyA.linear_velocity = bodyA.linear_velocity.sub_scaled(impulse, bodyA.inv_mass)
+        bodyB.linear_velocity = bodyB.linear_velocity.add_scaled(impulse, bodyB.inv_mass)
 
     def resolve_collision_with_rotation(self, contact: Manifold):
         body_a = contact.bodyA
@@ -167,22 +827,15 @@ class World:
             self.ra_list[i] = ra
             self.rb_list[i] = rb
 
-            ra_perp = Vector2(-ra.y, ra.x)
-            rb_perp = Vector2(-rb.y, rb.x)
-
-            angular_linear_velocity_a = ra_perp * body_a.angular_velocity
-            angular_linear_velocity_b = rb_perp * body_b.angular_velocity
-
-            relative_velocity = (body_b.linear_velocity + angular_linear_velocity_b) - \
-                                (body_a.linear_velocity + angular_linear_velocity_a)
+            relative_velocity = ContactSolver.relative_velocity(body_a, body_b, ra, rb)
 
             contact_velocity_mag = relative_velocity.dot(normal)
 
             if contact_velocity_mag > 0:
                 continue
 
-            ra_perp_dot_n = ra_perp.dot(normal)
-            rb_perp_dot_n = rb_perp.dot(normal)
+            ra_perp_dot_n = ra.perp_dot(normal)
+            rb_perp_dot_n = rb.perp_dot(normal)
 
             denom = (body_a.inv_mass + body_b.inv_mass +
                      (ra_perp_dot_n * ra_perp_dot_n) * body_a.inv_inertia +
@@ -200,10 +853,7 @@ class World:
             ra = self.ra_list[i]
             rb = self.rb_list[i]
 
-            body_a.linear_velocity -= impulse * body_a.inv_mass
-            body_a.angular_velocity -= ra.cross(impulse) * body_a.inv_inertia
-            body_b.linear_velocity += impulse * body_b.inv_mass
-            body_b.angular_velocity += rb.cross(impulse) * body_b.inv_inertia
+            ContactSolver.apply_impulse(body_a, body_b, impulse, ra, rb)
 
     def resolve_collision_with_rotation_and_friction(self, contact: Manifold):
         bodyA = contact.bodyA
@@ -233,22 +883,15 @@ class World:
             self.ra_list[i] = ra
             self.rb_list[i] = rb
 
-            ra_perp = Vector2(-ra.y, ra.x)
-            rb_perp = Vector2(-rb.y, rb.x)
-
-            angular_linear_velocityA = ra_perp * bodyA.angular_velocity
-            angular_linear_velocityB = rb_perp * bodyB.angular_velocity
-
-            relative_velocity = ((bodyB.linear_velocity + angular_linear_velocityB) -
-                                 (bodyA.linear_velocity + angular_linear_velocityA))
+            relative_velocity = ContactSolver.relative_velocity(bodyA, bodyB, ra, rb)
 
             contact_velocity_mag = relative_velocity.dot(normal)
 
             if contact_velocity_mag > 0:
                 continue
 
-            ra_perp_dot_normal = ra_perp.dot(normal)
-            rb_perp_dot_normal = rb_perp.dot(normal)
+            ra_perp_dot_normal = ra.perp_dot(normal)
+            rb_perp_dot_normal = rb.perp_dot(normal)
 
             denominator = (bodyA.inv_mass + bodyB.inv_mass +
                            (ra_perp_dot_normal ** 2) * bodyA.inv_inertia +
@@ -268,33 +911,23 @@ class World:
             ra = self.ra_list[i]
             rb = self.rb_list[i]
 
-            bodyA.linear_velocity -= impulse * bodyA.inv_mass
-            bodyA.angular_velocity -= ra.cross(impulse) * bodyA.inv_inertia
-            bodyB.linear_velocity += impulse * bodyB.inv_mass
-            bodyB.angular_velocity += rb.cross(impulse) * bodyB.inv_inertia
+            ContactSolver.apply_impulse(bodyA, bodyB, impulse, ra, rb)
 
         for i in range(contact_count):
             ra = self.ra_list[i]
             rb = self.rb_list[i]
 
-            ra_perp = Vector2(-ra.y, ra.x)
-            rb_perp = Vector2(-rb.y, rb.x)
-
-            angular_linear_velocityA = ra_perp * bodyA.angular_velocity
-            angular_linear_velocityB = rb_perp * bodyB.angular_velocity
+            relative_velocity = ContactSolver.relative_velocity(bodyA, bodyB, ra, rb)
 
-            relative_velocity = ((bodyB.linear_velocity + angular_linear_velocityB) -
-                                 (bodyA.linear_velocity + angular_linear_velocityA))
-
-            tangent = relative_velocity - relative_velocity.dot(normal) * normal
+            tangent = relative_velocity.copy().sub_scaled(normal, relative_velocity.dot(normal))
 
             if tangent.length_squared() < 1e-6:
                 continue
             else:
                 tangent = tangent.normalize()
 
-            ra_perp_dot_tangent = ra_perp.dot(tangent)
-            rb_perp_dot_tangent = rb_perp.dot(tangent)
+            ra_perp_dot_tangent = ra.perp_dot(tangent)
+            rb_perp_dot_tangent = rb.perp_dot(tangent)
 
             denominator = (bodyA.inv_mass + bodyB.inv_mass +
                            (ra_perp_dot_tangent ** 2) * bodyA.inv_inertia +
@@ -318,7 +951,77 @@ class World:
             ra = self.ra_list[i]
             rb = self.rb_list[i]
 
-            bodyA.linear_velocity -= friction_impulse * bodyA.inv_mass
-            bodyA.angular_velocity -= ra.cross(friction_impulse) * bodyA.inv_inertia
-            bodyB.linear_velocity += friction_impulse * bodyB.inv_mass
-            bodyB.angular_velocity += rb.cross(friction_impulse) * bodyB.inv_inertia
\ No newline at end of file
+            ContactSolver.apply_impulse(bodyA, bodyB, friction_impulse, ra, rb)
+
+    def resolve_collision_with_warm_start(self, contact: Manifold):
+        bodyA = contact.bodyA
+        bodyB = contact.bodyB
+        normal = contact.normal
+        tangent = Vector2(normal.y, -normal.x)
+        contact_count = contact.contact_count
+
+        e = min(bodyA.matter.restitution, bodyB.matter.restitution)
+        sf = (bodyA.matter.static_friction + bodyB.matter.static_friction) * 0.5
+        df = (bodyA.matter.dynamic_friction + bodyB.matter.dynamic_friction) * 0.5
+
+        points = [contact.contact1, contact.contact2]
+        ra_list = [points[i] - bodyA.position for i in range(contact_count)]
+        rb_list = [points[i] - bodyB.position for i in range(contact_count)]
+
+        # Restitution targets the approach speed measured before the cached impulses are reapplied.
+        velocity_biases = []
+        for i in range(contact_count):
+            relative_velocity = ContactSolver.relative_velocity(bodyA, bodyB, ra_list[i], rb_list[i])
+            contact_velocity_mag = relative_velocity.dot(normal)
+            velocity_biases.append(-e * contact_velocity_mag if contact_velocity_mag < -self.restitution_threshold else 0.0)
+
+        for i in range(contact_count):
+            impulse = normal * contact.normal_impulses[i] + tangent * contact.tangent_impulses[i]
+            ContactSolver.apply_impulse(bodyA, bodyB, impulse, ra_list[i], rb_list[i])
+
+        # Like the other resolvers, every point works from the same velocities and takes its share of the impulse.
+        normal_increments = []
+        for i in range(contact_count):
+            ra = ra_list[i]
+            rb = rb_list[i]
+
+            relative_velocity = ContactSolver.relative_velocity(bodyA, bodyB, ra, rb)
+            ra_cross_normal = ra.cross(normal)
+            rb_cross_normal = rb.cross(normal)
+            denominator = (bodyA.inv_mass + bodyB.inv_mass +
+                           (ra_cross_normal ** 2) * bodyA.inv_inertia +
+                           (rb_cross_normal ** 2) * bodyB.inv_inertia)
+
+            j = (-relative_velocity.dot(normal) + velocity_biases[i]) / denominator / contact_count
+            old_impulse = contact.normal_impulses[i]
+            new_impulse = max(old_impulse + j, 0.0)
+            contact.normal_impulses[i] = new_impulse
+            normal_increments.append(new_impulse - old_impulse)
+
+        for i in range(contact_count):
+            ContactSolver.apply_impulse(bodyA, bodyB, normal * normal_increments[i], ra_list[i], rb_list[i])
+
+        tangent_increments = []
+        for i in range(contact_count):
+            ra = ra_list[i]
+            rb = rb_list[i]
+
+            relative_velocity = ContactSolver.relative_velocity(bodyA, bodyB, ra, rb)
+            ra_cross_tangent = ra.cross(tangent)
+            rb_cross_tangent = rb.cross(tangent)
+            denominator = (bodyA.inv_mass + bodyB.inv_mass +
+                           (ra_cross_tangent ** 2) * bodyA.inv_inertia +
+                           (rb_cross_tangent ** 2) * bodyB.inv_inertia)
+
+            jt = -relative_velocity.dot(tangent) / denominator / contact_count
+            old_impulse = contact.tangent_impulses[i]
+            new_impulse = old_impulse + jt
+            max_friction = contact.normal_impulses[i] * sf
+            if abs(new_impulse) > max_friction:
+                max_friction = contact.normal_impulses[i] * df
+                new_impulse = max(-max_friction, min(new_impulse, max_friction))
+            contact.tangent_impulses[i] = new_impulse
+            tangent_increments.append(new_impulse - old_impulse)
+
+        for i in range(contact_count):
+            ContactSolver.apply_impulse(bodyA, bodyB, tangent * tangent_increments[i], ra_list[i], rb_list[i])
@@ -0,0 +1,248 @@
+import multiprocessing
+from multiprocessing.shared_memory import SharedMemory
+from typing import List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from body_store import BodyStore
+from vector import Vector2
+from world import World
+
+
+class WorldBatch:
+    STATE_COLUMNS = 6
+
+    def __init__(self, worlds: List[World], processes: int = 0):
+        if np is None:
+            raise ImportError("World batches require numpy.")
+        if not worlds:
+            raise ValueError("A world batch needs at least one world.")
+        if processes < 0:
+            raise ValueError("Processes must be a positive value.")
+        if any(world.batched for world in worlds) or len(set(map(id, worlds))) != len(worlds):
+            raise ValueError("A world can only be in one batch.")
+
+        self.worlds = worlds
+        self.processes = min(processes, len(worlds))
+        self.offsets = []
+        row_count = 0
+        for world in worlds:
+            self.offsets.append(row_count)
+            row_count += world.body_count
+        self.row_count = row_count
+        for world in worlds:
+            world.batched = True
+
+        self.store = None
+        self.memory = None
+        self.connections = []
+        self.workers = []
+
+        if self.processes:
+            self.start_workers()
+        else:
+            self.share_store()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def world_count(self) -> int:
+        return len(self.worlds)
+
+    def rows(self, index: int) -> slice:
+        # Rows follow each world's body order, which stays fixed because batched worlds refuse to add or remove bodies.
+        return slice(self.offsets[index], self.offsets[index] + self.worlds[index].body_count)
+
+    def share_store(self):
+        # All worlds integrate through one store, so each substep is a single vectorized pass over every body.
+        first = self.worlds[0]
+        for world in self.worlds:
+            if world.executor is not None:
+                raise ValueError("Batched worlds cannot use an island executor.")
+            if (world.gravity != first.gravity or world.damping != first.damping or
+                    world.sequential_impulses != first.sequential_impulses):
+                raise ValueError("Batched worlds must share gravity, damping and solver mode.")
+
+        self.store = BodyStore(max(self.row_count, 1))
+        for world in self.worlds:
+            if world.body_store is not None:
+                for body in reversed(world.bodies):
+                    world.body_store.remove(body)
+            world.body_store = self.store
+            world.bounds_valid = False
+            for body in world.bodies:
+                self.store.add(body)
+
+        self.position = self.store.position[:self.row_count]
+        self.linear_velocity = self.store.linear_velocity[:self.row_count]
+        self.angle = self.store.angle[:self.row_count]
+        self.angular_velocity = self.store.angular_velocity[:self.row_count]
+
+    @staticmethod
+    def map_state(buffer, row_count: int):
+        state = np.ndarray((row_count, WorldBatch.STATE_COLUMNS), dtype=np.float64, buffer=buffer)
+        return state[:, 0:2], state[:, 2:4], state[:, 4], state[:, 5]
+
+    def start_workers(self):
+        for world in self.worlds:
+            if world.executor is not None:
+                raise ValueError("Batched worlds cannot use an island executor.")
+
+        size = max(self.row_count, 1) * self.STATE_COLUMNS * 8
+        self.memory = SharedMemory(create=True, size=size)
+        self.position, self.linear_velocity, self.angle, self.angular_velocity = self.map_state(
+            self.memory.buf, self.row_count)
+        for index, world in enumerate(self.worlds):
+            WorldBatch.write_state(world, self.offsets[index], self.position, self.linear_velocity,
+                                   self.angle, self.angular_velocity)
+
+        # Each worker owns a contiguous run of worlds for the lifetime of the batch.
+        chunk = -(-len(self.worlds) // self.processes)
+        for start in range(0, len(self.worlds), chunk):
+            parent, child = multiprocessing.Pipe()
+            indices = list(range(start, min(start + chunk, len(self.worlds))))
+            worker = multiprocessing.Process(
+                target=WorldBatch.run_worker,
+                args=(child, self.memory.name, self.row_count,
+                      [self.worlds[i] for i in indices], [self.offsets[i] for i in indices]),
+                daemon=True)
+            worker.start()
+            child.close()
+            self.connections.append(parent)
+            self.workers.append(worker)
+
+    @staticmethod
+    def write_state(world: World, offset: int, position, linear_velocity, angle, angular_velocity):
+        for row, body in enumerate(world.bodies, offset):
+            body_position = body.position
+            body_velocity = body.linear_velocity
+            position[row] = body_position.x, body_position.y
+            linear_velocity[row] = body_velocity.x, body_velocity.y
+            angle[row] = body.angle
+            angular_velocity[row] = body.angular_velocity
+
+    @staticmethod
+    def read_state(world: World, offset: int, position, linear_velocity, angle, angular_velocity):
+        for row, body in enumerate(world.bodies, offset):
+            x, y = position[row].tolist()
+            vx, vy = linear_velocity[row].tolist()
+            body.position = Vector2(x, y)
+            body.linear_velocity = Vector2(vx, vy)
+            body.angle = float(angle[row])
+            body.angular_velocity = float(angular_velocity[row])
+            body.transform_update_required = True
+            body.aabb_update_required = True
+            if not body.is_static:
+                body.wake()
+
+    @staticmethod
+    def run_worker(connection, memory_name: str, row_count: int, worlds: List[World], offsets: List[int]):
+        memory = SharedMemory(name=memory_name)
+        state = WorldBatch.map_state(memory.buf, row_count)
+        try:
+            while True:
+                command, arguments = connection.recv()
+                if command == 'step':
+                    dt, iterations, steps = arguments
+                    for world in worlds:
+                        for _ in range(steps):
+                            world.step(dt, iterations)
+                    for world, offset in zip(worlds, offsets):
+                        WorldBatch.write_state(world, offset, *state)
+                elif command == 'push':
+                    for world, offset in zip(worlds, offsets):
+                        WorldBatch.read_state(world, offset, *state)
+                connection.send(None)
+                if command == 'close':
+                    break
+        finally:
+            del state
+            memory.close()
+            connection.close()
+
+    def broadcast(self, command: str, arguments=None):
+        for connection in self.connections:
+            connection.send((command, arguments))
+        for connection in self.connections:
+            connection.recv()
+
+    def step(self, dt: float, iterations: int = 1, steps: int = 1):
+        if self.processes:
+            self.broadcast('step', (dt, iterations, steps))
+            return
+
+        for _ in range(steps):
+            self.step_shared(dt, iterations)
+
+    def step_shared(self, dt: float, iterations: int):
+        # Mirrors World.step with the integration of every world hoisted into the shared store.
+        first = self.worlds[0]
+        iterations = max(min(iterations, World.MAX_ITERATIONS), World.MIN_ITERATIONS)
+
+        for _ in range(iterations):
+            if first.sequential_impulses:
+                for world in self.worlds:
+                    world.broad_phase()
+                    world.find_contacts()
+                self.store.integrate_velocities(dt, first.gravity, first.damping, iterations)
+                solvers = [world.solve_velocities() for world in self.worlds]
+                bullets = [world.begin_bullets() for world in self.worlds]
+                self.store.integrate_positions(dt / iterations)
+                for world, solver, world_bullets in zip(self.worlds, solvers, bullets):
+                    world.solve_positions(solver)
+                    world.advance_bullets(world_bullets, dt / iterations)
+            else:
+                for world in self.worlds:
+                    world.contact_list.clear()
+                bullets = [world.begin_bullets() for world in self.worlds]
+                self.store.integrate(dt, first.gravity, first.damping, iterations)
+                for world, world_bullets in zip(self.worlds, bullets):
+                    world.advance_bullets(world_bullets, dt / iterations)
+                    world.broad_phase()
+                    world.narrow_phase()
+
+        for world in self.worlds:
+            if world.allow_sleeping:
+                world.update_sleep(dt)
+            world.version += 1
+
+    def push(self):
+        # Hands edits made to the state arrays back to the bodies, waking them so the next step moves them.
+        if self.processes:
+            self.broadcast('push')
+            return
+
+        count = self.row_count
+        self.store.transform_update_required[:count] = True
+        self.store.aabb_update_required[:count] = True
+        for world in self.worlds:
+            world.version += 1
+        for body in self.store.bodies:
+            if not body.is_static and not body.is_awake:
+                body.wake()
+
+    def close(self):
+        if self.processes and self.workers:
+            self.broadcast('close')
+            for worker in self.workers:
+                worker.join()
+            for connection in self.connections:
+                connection.close()
+            self.workers.clear()
+            self.connections.clear()
+            # Only the workers stepped these worlds; worlds sharing one store stay batched, as their rows interleave.
+            for world in self.worlds:
+                world.batched = False
+
+        if self.memory is not None:
+            self.position = self.linear_velocity = self.angle = self.angular_velocity = None
+            self.memory.close()
+            self.memory.unlink()
+            self.memory = None